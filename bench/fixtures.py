@@ -0,0 +1,311 @@
+"""
+Fake-root fixtures for the benchmarks.
+
+build_root() writes a synthetic sysfs/procfs tree (power_supply, hwmon,
+drm, block, cpufreq, /proc/stat, meminfo, vmstat, cpuinfo) and
+stand-in smartctl, nvidia-smi, systemctl and sudo scripts.
+fake_system() points the collectors at it and replaces the psutil
+calls they make, so a benchmark run never touches real hardware and
+gives the same numbers on any Linux box.
+"""
+import contextlib
+import json
+import os
+import stat
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GIB = 1024 ** 3
+
+DISKS = ("nvme0n1", "nvme1n1", "sda")
+
+GPUS = (
+    "0, NVIDIA GeForce RTX 3060 Laptop GPU, 54, 12, 1024, 6144, P8",
+    "1, NVIDIA RTX A2000, 61, 40, 2048, 8192, P2",
+)
+
+FAILED_UNITS = ("bluetooth.service", "nfs-mount.service")
+
+# Size of the fake process table
+PROCESSES = 2000
+
+CPUS = 8
+
+# /proc/meminfo in kB, in kernel order; the collectors only read a few
+MEMINFO = (
+    ("MemTotal", 16 * 1024 ** 2), ("MemFree", 3 * 1024 ** 2), ("MemAvailable", 9 * 1024 ** 2),
+    ("Buffers", 412_388), ("Cached", 5_120_004), ("SwapCached", 10_240),
+    ("Active", 6_291_456), ("Inactive", 4_194_304), ("Active(anon)", 3_145_728),
+    ("Inactive(anon)", 524_288), ("Active(file)", 3_145_728), ("Inactive(file)", 3_670_016),
+    ("Unevictable", 65_536), ("Mlocked", 16), ("SwapTotal", 8 * 1024 ** 2),
+    ("SwapFree", 8 * 1024 ** 2 - 512 * 1024), ("Zswap", 0), ("Zswapped", 0), ("Dirty", 1_204),
+    ("Writeback", 0), ("AnonPages", 3_600_000), ("Mapped", 1_100_000), ("Shmem", 420_000),
+    ("KReclaimable", 380_000), ("Slab", 620_000), ("SReclaimable", 380_000),
+    ("SUnreclaim", 240_000), ("KernelStack", 24_000), ("PageTables", 60_000),
+    ("SecPageTables", 0), ("NFS_Unstable", 0), ("Bounce", 0), ("WritebackTmp", 0),
+    ("CommitLimit", 16 * 1024 ** 2), ("Committed_AS", 14 * 1024 ** 2),
+    ("VmallocTotal", 34_359_738_367), ("VmallocUsed", 90_000), ("VmallocChunk", 0),
+    ("Percpu", 12_000), ("HardwareCorrupted", 0), ("AnonHugePages", 0),
+    ("ShmemHugePages", 0), ("ShmemPmdMapped", 0), ("FileHugePages", 0),
+    ("FilePmdMapped", 0), ("HugePages_Total", 0), ("HugePages_Free", 0),
+    ("HugePages_Rsvd", 0), ("HugePages_Surp", 0), ("Hugepagesize", 2048),
+    ("Hugetlb", 0), ("DirectMap4k", 400_000), ("DirectMap2M", 9_000_000),
+    ("DirectMap1G", 8 * 1024 ** 2),
+)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _script(path, body):
+    _write(path, "#!/bin/sh\n" + body)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def _smart_json(disk):
+    if disk.startswith("nvme"):
+        return {
+            "model_name": f"Fake NVMe {disk}",
+            "smart_status": {"passed": True},
+            "nvme_smart_health_information_log": {
+                "critical_warning": 0,
+                "temperature": 41,
+                "available_spare": 100,
+                "available_spare_threshold": 10,
+                "percentage_used": 7,
+                "data_units_read": 41_234_567,
+                "data_units_written": 38_765_432,
+                "power_cycles": 1312,
+                "power_on_hours": 4211,
+                "unsafe_shutdowns": 87,
+                "media_errors": 0,
+            },
+        }
+
+    return {
+        "model_name": "Fake SATA SSD",
+        "smart_status": {"passed": True},
+        "logical_block_size": 512,
+        "temperature": {"current": 35},
+        "power_on_time": {"hours": 20311},
+        "ata_smart_attributes": {"table": [
+            {"id": 9, "value": 53, "raw": {"value": 20311}},
+            {"id": 12, "value": 99, "raw": {"value": 1544}},
+            {"id": 177, "value": 91, "raw": {"value": 112}},
+            {"id": 194, "value": 65, "raw": {"value": 35}},
+            {"id": 241, "value": 99, "raw": {"value": 45_678_901_234}},
+        ]},
+    }
+
+
+def build_root(root):
+    """
+    Populate `root` and return a namespace of the paths the collectors
+    are pointed at.
+    """
+    paths = SimpleNamespace(
+        root=root,
+        bin=f"{root}/bin",
+        power_supply=f"{root}/sys/class/power_supply",
+        hwmon=f"{root}/sys/class/hwmon",
+        drm_card=f"{root}/sys/class/drm/card1",
+        block=f"{root}/sys/block",
+        proc=f"{root}/proc",
+        proc_stat=f"{root}/proc/stat",
+        cpu=f"{root}/sys/devices/system/cpu",
+        shm=f"{root}/dev/shm/arch-health",
+    )
+
+    bat = f"{paths.power_supply}/BAT0"
+    for name, value in {
+        "type": "Battery", "status": "Discharging", "capacity": "76",
+        "energy_full": "45210000", "energy_full_design": "57000000",
+        "cycle_count": "412",
+    }.items():
+        _write(f"{bat}/{name}", value + "\n")
+    _write(f"{paths.power_supply}/AC/online", "0\n")
+
+    chips = {
+        "hwmon0": ("coretemp", [("Package id 0", 67000)] + [(f"Core {i}", 60000 + i * 1000) for i in range(8)]),
+        "hwmon1": ("nvme", [("Composite", 41850), ("Sensor 1", 41850)]),
+        "hwmon2": ("nvme", [("Composite", 44850)]),
+        "hwmon3": ("acpitz", [("", 52000)]),
+        "hwmon4": ("iwlwifi_1", [("", 38000)]),
+    }
+    for entry, (name, sensors) in chips.items():
+        base = f"{paths.hwmon}/{entry}"
+        _write(f"{base}/name", name + "\n")
+        for i, (label, milli) in enumerate(sensors, 1):
+            _write(f"{base}/temp{i}_input", f"{milli}\n")
+            _write(f"{base}/temp{i}_max", "100000\n")
+            _write(f"{base}/temp{i}_crit", "105000\n")
+            if label:
+                _write(f"{base}/temp{i}_label", label + "\n")
+
+    _write(f"{paths.drm_card}/device/vendor", "0x8086\n")
+    _write(f"{paths.drm_card}/gt_cur_freq_mhz", "350\n")
+    _write(f"{paths.drm_card}/gt_max_freq_mhz", "1300\n")
+
+    for disk in DISKS:
+        _write(f"{paths.block}/{disk}/removable", "0\n")
+    # Never probed: not disks, or removable media
+    for disk in ("loop0", "zram0"):
+        os.makedirs(f"{paths.block}/{disk}", exist_ok=True)
+    _write(f"{paths.block}/sdb/removable", "1\n")
+
+    cores = "".join(
+        f"cpu{i} {1000 + i} 10 {500 + i} 90000 30 0 5 2 0 0\n" for i in range(8)
+    )
+    _write(paths.proc_stat, "cpu  8028 80 4028 720000 240 0 40 16 0 0\n" + cores + "intr 0\n")
+
+    _write(f"{paths.proc}/meminfo", "".join(
+        f"{key + ':':<16}{kb:>8}{'' if key.startswith('HugePages_') else ' kB'}\n"
+        for key, kb in MEMINFO
+    ))
+    _write(f"{paths.proc}/vmstat", "pswpin 1024\npswpout 4096\n")
+    _write(f"{paths.proc}/cpuinfo", "".join(
+        f"processor\t: {i}\nvendor_id\t: GenuineIntel\nmodel name\t: Fake CPU\n"
+        f"cpu MHz\t\t: {2100 + i * 10}.000\ncache size\t: 12288 KB\nflags\t\t: fpu vme de pse tsc msr\n\n"
+        for i in range(CPUS)
+    ))
+    for i in range(CPUS):
+        policy = f"{paths.cpu}/cpufreq/policy{i}"
+        _write(f"{policy}/scaling_cur_freq", f"{(2100 + i * 10) * 1000}\n")
+        _write(f"{policy}/scaling_max_freq", "4700000\n")
+
+    for disk in DISKS:
+        _write(f"{root}/smart/{disk}.json", json.dumps(_smart_json(disk)))
+
+    # Stand-ins for the external tools, found first on PATH
+    _script(f"{paths.bin}/sudo", '[ "$1" = -n ] && shift\nexec "$@"\n')
+    _script(f"{paths.bin}/smartctl", (
+        'for dev; do :; done\n'
+        f'cat "{root}/smart/$(basename "$dev").json"\n'
+    ))
+    _script(f"{paths.bin}/nvidia-smi", (
+        "while :; do\n"
+        + "".join(f'  echo "{line}"\n' for line in GPUS)
+        + "  sleep 1\ndone\n"
+    ))
+    _script(f"{paths.bin}/systemctl", "".join(
+        f'echo "{unit} loaded failed failed Fake unit"\n' for unit in FAILED_UNITS
+    ))
+
+    return paths
+
+
+def _fake_process_iter():
+    """
+    process_iter() over PROCESSES fake processes whose counters advance
+    on every call, so CPU and I/O deltas are never zero.
+    """
+    boot = time.time() - 86400
+    calls = [0]
+
+    def process_iter(attrs=None, ad_value=None):
+        calls[0] += 1
+        n = calls[0]
+        for pid in range(1, PROCESSES + 1):
+            yield SimpleNamespace(pid=pid, info={
+                "name": f"proc{pid % 97}",
+                "create_time": boot + pid,
+                "cpu_times": SimpleNamespace(user=pid * 0.01 * n, system=pid * 0.002 * n),
+                "memory_info": SimpleNamespace(rss=(pid * 7919 % 4096) * 1024 * 1024),
+                "io_counters": SimpleNamespace(read_bytes=pid * 4096 * n, write_bytes=pid * 512 * n),
+            })
+
+    return process_iter
+
+
+@contextlib.contextmanager
+def fake_procfs(paths):
+    """
+    Point the native procfs backend, and psutil's own /proc reads, at
+    the tree from build_root().
+    """
+    import psutil
+
+    from core import procfs
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(procfs, "MEMINFO", f"{paths.proc}/meminfo"))
+        stack.enter_context(mock.patch.object(procfs, "_freq", procfs.CpuFreq(paths.cpu)))
+        stack.enter_context(mock.patch.object(psutil, "PROCFS_PATH", paths.proc))
+        yield paths
+
+
+def _fake_psutil():
+    return {
+        "process_iter": _fake_process_iter(),
+        "virtual_memory": lambda: SimpleNamespace(
+            total=16 * GIB, available=9 * GIB, used=6 * GIB, free=3 * GIB, percent=43.8
+        ),
+        "swap_memory": lambda: SimpleNamespace(
+            total=8 * GIB, used=GIB // 2, free=8 * GIB - GIB // 2, percent=6.2
+        ),
+        "sensors_battery": lambda: SimpleNamespace(
+            percent=76, secsleft=9000, power_plugged=False
+        ),
+        "sensors_temperatures": lambda: {},
+        "cpu_count": lambda logical=True: 8 if logical else 4,
+        "cpu_freq": lambda percpu=False: SimpleNamespace(current=2100.0, min=400.0, max=4700.0),
+        "getloadavg": lambda: (0.82, 0.64, 0.51),
+        "cpu_percent": lambda interval=None, percpu=False: [3.0] * 8 if percpu else 3.0,
+    }
+
+
+@contextlib.contextmanager
+def fake_system(paths):
+    """
+    Point every collector at the tree from build_root() for the
+    duration of the block.
+    """
+    import psutil
+
+    from core import battery, cpu, gpu, helper, processes, publish, ssd, sysfs, system, temps
+    from core.cache import CACHE
+    from engine import rules
+
+    with contextlib.ExitStack() as stack:
+        patch = stack.enter_context
+
+        for name, fake in _fake_psutil().items():
+            patch(mock.patch.object(psutil, name, fake))
+
+        patch(fake_procfs(paths))
+        patch(mock.patch.dict(os.environ, {"PATH": paths.bin + os.pathsep + os.environ.get("PATH", "")}))
+        patch(mock.patch.object(battery, "POWER_SUPPLY_PATH", paths.power_supply))
+        patch(mock.patch.object(gpu, "INTEL_CARD", paths.drm_card))
+        patch(mock.patch.object(gpu, "_nvidia", gpu.NvidiaStream(f"{paths.bin}/nvidia-smi")))
+        patch(mock.patch.object(ssd, "SYS_BLOCK", paths.block))
+        patch(mock.patch.object(temps, "_hwmon", temps.HwmonIndex(paths.hwmon)))
+        patch(mock.patch.object(cpu, "_sampler", cpu.CpuSampler(paths.proc_stat)))
+        patch(mock.patch.object(processes, "_sampler", processes.ProcessSampler()))
+        # No privileged helper: SMART goes through the sudo stand-in
+        patch(mock.patch.object(helper, "_client", helper.HelperClient(f"{paths.root}/run/helper.sock")))
+        # No D-Bus: failed units come from the systemctl stand-in
+        patch(mock.patch.object(system, "open_dbus_connection", None))
+        patch(mock.patch.object(system, "_watcher", system.SystemdWatcher()))
+        # Never pick up a real daemon's snapshot or the user's rules.json
+        patch(mock.patch.object(publish, "_reader", publish.SnapshotReader(paths.shm)))
+        patch(mock.patch.object(publish, "read_snapshot", publish._reader.read))
+        patch(mock.patch.object(rules, "_rules", rules.RULES))
+        patch(mock.patch.object(rules, "_engine", rules.RuleEngine()))
+
+        CACHE.invalidate()
+        sysfs.close()
+        try:
+            yield paths
+        finally:
+            gpu._nvidia.stop()
+            CACHE.invalidate()
+            sysfs.close()
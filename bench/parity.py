@@ -0,0 +1,118 @@
+"""
+Parity check of engine.batch.score_batch against score_v2.
+
+Scores random rows built from the values that matter (exactly on every
+threshold of the default rule table, just either side of it, NaN and
+None) with the NumPy path and the scalar fallback, and compares every
+score and component deduction with score_v2.calculate_health and
+score_components on the equivalent snapshot. A second pass drops each
+column in turn, as for history recorded before the column existed.
+
+    python bench/parity.py
+    python bench/parity.py --rows 50000 --seed 7
+
+Exits 1 on the first few mismatching rows, printed to stderr.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import batch, score_v2  # noqa: E402
+from engine.rules import RULES  # noqa: E402
+
+# How many mismatches to print before giving up
+MAX_REPORTED = 10
+
+
+def column_values():
+    """
+    {column: candidate values}: every numeric threshold of the default
+    rules reading the column, the values just either side, a quiet
+    reading, NaN and None.
+    """
+    values = {column: {0.0, math.nan, None} for column in batch.BATCH_FIELDS}
+    for spec in batch.batch_rules(RULES):
+        column = batch.FIELD_COLUMNS[spec["field"]][0]
+        for level in spec["levels"]:
+            threshold = level["threshold"]
+            if isinstance(threshold, (int, float)):
+                values[column] |= {threshold, threshold - 0.5, threshold + 0.5}
+
+    values["ssd.passed"] = {0.0, 1.0, math.nan, None}
+    values["services.failed"] = {0.0, 1.0, 2.0, 5.0, 6.0, math.nan, None}
+    # Sets order NaN unpredictably; sort for a reproducible run
+    return {c: sorted(v, key=lambda x: (x is None, repr(x))) for c, v in values.items()}
+
+
+def random_columns(rows, rng, drop=None):
+    values = column_values()
+    return {
+        column: [rng.choice(choices) for _ in range(rows)]
+        for column, choices in values.items()
+        if column != drop
+    }
+
+
+def check(columns, label):
+    """
+    Compare both batch paths with score_v2 row by row; returns the
+    mismatches as printable lines.
+    """
+    numpy_scores, numpy_deductions = batch.score_batch(columns, RULES)
+    saved, batch.np = batch.np, None
+    try:
+        scalar_scores, scalar_deductions = batch.score_batch(columns, RULES)
+    finally:
+        batch.np = saved
+
+    paths = [("scalar", scalar_scores, scalar_deductions)]
+    if saved is not None:
+        paths.append(("numpy", numpy_scores, numpy_deductions))
+
+    rows = len(next(iter(columns.values())))
+    mismatches = []
+    for i in range(rows):
+        row = {column: values[i] for column, values in columns.items()}
+        data = batch.snapshot_from_row(row)
+        score, _ = score_v2.calculate_health(data)
+        expected = {
+            component: score_v2.COMPONENT_MAX[component] - sub_score
+            for component, (sub_score, _) in score_v2.score_components(data).items()
+        }
+        for name, scores, deductions in paths:
+            got = {component: float(deductions[component][i]) for component in expected}
+            if float(scores[i]) != score or got != expected:
+                mismatches.append(
+                    f"{label} {name} row {i}: {row}\n"
+                    f"  score {scores[i]} != {score}, deductions {got} != {expected}"
+                )
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="score_batch parity with score_v2")
+    parser.add_argument("--rows", type=int, default=20000, help="Random rows per pass")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mismatches = check(random_columns(args.rows, rng), "all columns")
+    for column in batch.BATCH_FIELDS:
+        mismatches += check(random_columns(args.rows // 10, rng, drop=column), f"without {column}")
+
+    for line in mismatches[:MAX_REPORTED]:
+        print(line, file=sys.stderr)
+    if mismatches:
+        print(f"{len(mismatches)} mismatching rows", file=sys.stderr)
+        return 1
+
+    print(f"score_batch matches score_v2 ({'NumPy and scalar' if batch.np else 'scalar only'})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
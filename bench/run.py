@@ -0,0 +1,264 @@
+"""
+Hermetic benchmark suite.
+
+Runs against the fake root from bench/fixtures.py and measures:
+  * latency of every collector, cold (caches and fd pool dropped) and warm
+  * the native procfs backend against the psutil calls it replaces
+  * an end-to-end main.main() tick, TUI and --json
+  * calculate_health throughput (score_v2 reference and the rule engine)
+  * render_dashboard time
+  * peak Python heap and RSS over a tick
+
+    python bench/run.py                          # JSON on stdout
+    python bench/run.py --save bench/baseline.json
+    python bench/run.py --baseline bench/baseline.json
+
+With --baseline, every metric is compared against the stored value and
+the run fails when one is worse by more than the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fixtures import build_root, fake_procfs, fake_system  # noqa: E402
+
+TOLERANCE = 0.25
+
+# Metrics where a larger value is better
+HIGHER_IS_BETTER = {"ops/s"}
+
+
+def timed(fn, runs, setup=None):
+    """
+    Median and p95 wall time of `fn` in milliseconds.
+    """
+    samples = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "value": round(statistics.median(samples), 4),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "unit": "ms",
+    }
+
+
+def throughput(fn, seconds):
+    """
+    Calls per second of `fn`, measured over about `seconds`.
+    """
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            fn()
+        calls += 100
+    return {"value": round(calls / (time.perf_counter() - start)), "unit": "ops/s"}
+
+
+def _drop_caches():
+    from core import sysfs, temps
+    from core.cache import CACHE
+
+    CACHE.invalidate()
+    temps.rescan()
+    sysfs.close()
+
+
+def bench_collectors(runs):
+    from core import cpu
+    from core.collect import COLLECTORS, collector
+
+    cpu._sampler.warm_up()
+    results = {}
+    for name in COLLECTORS:
+        fn = collector(name)
+        fn()  # starts background readers (nvidia-smi stream, systemd watcher)
+        results[f"collector.{name}.cold"] = timed(fn, runs, setup=_drop_caches)
+        results[f"collector.{name}.warm"] = timed(fn, runs)
+    return results
+
+
+def bench_backends(paths, runs):
+    """
+    Memory and CPU frequency through core/procfs.py vs. real psutil,
+    both reading the fake /proc. psutil always takes its cpufreq files
+    from the host's /sys, so only its /proc/cpuinfo read is faked.
+    """
+    import psutil
+
+    from core import memory, procfs
+
+    with fake_procfs(paths):
+        procfs.memory()
+        procfs.cpu_freq()
+        return {
+            "backend.memory.procfs": timed(procfs.memory, runs),
+            "backend.memory.psutil": timed(memory._from_psutil, runs),
+            "backend.cpu_freq.procfs": timed(procfs.cpu_freq, runs),
+            "backend.cpu_freq.psutil": timed(psutil.cpu_freq, runs),
+        }
+
+
+def bench_main(runs):
+    import main
+
+    def tick(**kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.main(**kwargs)
+
+    tick()
+    return {
+        "main.tick": timed(tick, runs),
+        "main.tick.json": timed(lambda: tick(as_json=True), runs),
+    }
+
+
+def bench_scoring(seconds):
+    from core.collect import collect
+    from engine import rules, score_v2
+
+    data = collect()
+    engine = rules.RuleEngine()
+
+    # Alternating inputs so the engine cannot skip unchanged sections:
+    # a full snapshot vs. an empty one re-runs every rule, two CPU-only
+    # updates re-run just the CPU rules.
+    full = itertools.cycle([data, {}])
+    partial = itertools.cycle([{"cpu": {**data["cpu"], "usage_percent": p}} for p in (12.0, 95.0)])
+
+    return {
+        "calculate_health.score_v2": throughput(lambda: score_v2.calculate_health(data), seconds),
+        "calculate_health.rules": throughput(lambda: engine.evaluate(next(full)), seconds),
+        "calculate_health.rules.partial": throughput(lambda: engine.update(next(partial)), seconds),
+    }
+
+
+def bench_render(runs):
+    from rich.console import Console
+
+    import ui.dashboard as dashboard
+    from core.collect import collect
+    from engine.rules import calculate_health
+
+    data = collect()
+    score, issues = calculate_health(data)
+    console = Console(file=io.StringIO(), width=120, force_terminal=True, color_system="truecolor")
+
+    def render():
+        console.file.seek(0)
+        console.file.truncate()
+        dashboard.render_dashboard(data, score, issues)
+
+    dashboard.console, saved = console, dashboard.console
+    try:
+        return {"render_dashboard": timed(render, runs)}
+    finally:
+        dashboard.console = saved
+
+
+def bench_memory():
+    import main
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "memory.tick_peak_heap": {"value": round(peak / 1024, 1), "unit": "KiB"},
+        "memory.max_rss": {
+            "value": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "unit": "KiB",
+        },
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lines describing every metric that got worse than `baseline` by
+    more than `tolerance`.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name, {}).get("value")
+        if not before:
+            continue
+        ratio = result["value"] / before
+        if result["unit"] in HIGHER_IS_BETTER:
+            worse = ratio < 1 - tolerance
+        else:
+            worse = ratio > 1 + tolerance
+        if worse:
+            regressions.append(
+                f"{name}: {result['value']} {result['unit']} (baseline {before}, x{ratio:.2f})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="arch-health benchmark suite")
+    parser.add_argument("--runs", type=int, default=50, help="Samples per latency metric")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Duration of each throughput metric")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save", help="Write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="arch-health-bench-") as tmp:
+        paths = build_root(tmp)
+        results = bench_backends(paths, args.runs)
+        with fake_system(paths):
+            results.update(bench_collectors(args.runs))
+            results.update(bench_main(args.runs))
+            results.update(bench_scoring(args.seconds))
+            results.update(bench_render(args.runs))
+            results.update(bench_memory())
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Startup cost of one-shot CLI runs.
+
+Every case runs cli.py in fresh interpreters under -X importtime and
+reports the median wall time and total import time. A case fails when
+it imports a module it must stay clear of (rich for --json, PyQt6
+anywhere) or when its import time grew past the baseline by more than
+the tolerance.
+
+    python bench/startup.py
+    python bench/startup.py --save bench/startup.json
+    python bench/startup.py --baseline bench/startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "cli.py")
+
+# name -> (cli arguments, modules that must not be imported)
+CASES = {
+    "help": (["--help"], ["rich", "psutil", "PyQt6", "core.cpu"]),
+    "json-cpu-memory": (
+        ["--json", "--only", "cpu,memory"],
+        ["rich", "PyQt6", "core.ssd", "core.gpu", "core.system", "core.battery"]
+    ),
+    "json": (["--json"], ["rich", "PyQt6"]),
+}
+
+TOLERANCE = 0.25
+
+
+def run_case(args, runs):
+    walls = []
+    imports = []
+    modules = set()
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", CLI, *args],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        walls.append(time.perf_counter() - start)
+
+        # "import time: self [us] | cumulative | imported package"
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            total += int(self_us)
+            modules.add(name.strip())
+        imports.append(total)
+
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(imports) / 1000, 1),
+        "modules": modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="Fail on import-time regressions against this file")
+    parser.add_argument("--save", help="Write the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+    for name, (cli_args, forbidden) in CASES.items():
+        result = run_case(cli_args, args.runs)
+        modules = result.pop("modules")
+
+        leaked = sorted(m for m in forbidden if m in modules)
+        if leaked:
+            failures.append(f"{name}: imports {', '.join(leaked)}")
+
+        before = baseline.get(name, {}).get("import_ms")
+        if before and result["import_ms"] > before * (1 + args.tolerance):
+            failures.append(f"{name}: import time {result['import_ms']} ms (baseline {before} ms)")
+
+        results[name] = result
+
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
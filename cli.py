@@ -1,7 +1,75 @@
 import argparse
-import time
+import atexit
+import math
 import os
-from main import main
+import re
+import sys
+import time
+from datetime import datetime
+
+# main (and with it rich and the collectors) is imported only by the
+# command that needs it; see run().
+
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Tick of the daemon and the exporter when --interval is not given
+DEFAULT_INTERVAL = 3
+
+
+def parse_time(value):
+    """
+    "now", a relative age ("90s", "15m", "6h", "7d"), an ISO date/time
+    or a Unix timestamp -> Unix timestamp.
+    """
+    if value == "now":
+        return time.time()
+
+    m = _RELATIVE.match(value)
+    if m:
+        return time.time() - float(m.group(1)) * _UNITS[m.group(2)]
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+
+
+def parse_only(value):
+    """
+    "cpu,memory" -> ["cpu", "memory"], checked against the collector
+    registry.
+    """
+    from core.collect import COLLECTORS
+
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in COLLECTORS]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(
+            f"unknown collector(s): {', '.join(unknown) or repr(value)} "
+            f"(choose from {', '.join(COLLECTORS)})"
+        )
+    return names
+
+
+def show_history(args):
+    from engine.store import FIELDS, HistoryStore
+
+    fields = args.fields.split(",") if args.fields else FIELDS
+    print("time\t" + "\t".join(fields))
+
+    # Rows are streamed straight from the memory-mapped segments
+    for t, row in HistoryStore(args.store).query(args.since, args.until, fields):
+        stamp = datetime.fromtimestamp(t).isoformat(timespec="seconds")
+        print(stamp + "\t" + "\t".join(
+            "-" if math.isnan(row[f]) else f"{row[f]:g}" for f in fields
+        ))
+
 
 def run():
     parser = argparse.ArgumentParser(
@@ -16,23 +84,157 @@ def run():
 
     parser.add_argument(
         "--interval",
+        type=float,
+        default=None,
+        help="Fixed refresh interval in seconds (sub-second values allowed); "
+             "without it --watch refreshes each collector at its own cadence"
+    )
+
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Append every watch-mode snapshot to the history store"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the snapshot, score and issues as JSON (no TUI)"
+    )
+
+    parser.add_argument(
+        "--only",
+        type=parse_only,
+        metavar="NAMES",
+        help="Comma-separated collectors to run, e.g. cpu,memory"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print per-stage timings, spawns and file opens to stderr on exit"
+    )
+
+    sub = parser.add_subparsers(dest="command")
+
+    daemon_cmd = sub.add_parser(
+        "daemon",
+        help="Collect on a schedule and publish snapshots to shared memory"
+    )
+    # SUPPRESS keeps the top-level values when these are not repeated here
+    daemon_cmd.add_argument(
+        "--interval",
+        type=float,
+        default=argparse.SUPPRESS,
+        help="Collection interval in seconds (default: 3)"
+    )
+    daemon_cmd.add_argument(
+        "--record",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Also append every snapshot to the history store"
+    )
+
+    export_cmd = sub.add_parser(
+        "export",
+        help="Serve Prometheus metrics over HTTP"
+    )
+    export_cmd.add_argument(
+        "--interval",
+        type=float,
+        default=argparse.SUPPRESS,
+        help="How often the metrics payload is regenerated, in seconds"
+    )
+    export_cmd.add_argument(
+        "--listen",
+        default="127.0.0.1",
+        help="Address to bind (default: 127.0.0.1)"
+    )
+    export_cmd.add_argument(
+        "--port",
         type=int,
-        default=3,
-        help="Refresh interval in seconds"
+        default=9877,
+        help="TCP port (default: 9877)"
+    )
+    export_cmd.add_argument(
+        "--unix",
+        help="Serve on this Unix socket path instead of TCP"
+    )
+
+    helper_cmd = sub.add_parser(
+        "helper",
+        help="Run the privileged SMART helper (start with sudo or pkexec)"
+    )
+    helper_cmd.add_argument(
+        "--socket",
+        default=None,
+        help="Unix socket path (default: /run/arch-health/helper.sock)"
+    )
+
+    history = sub.add_parser("history", help="Show recorded history")
+    history.add_argument(
+        "--since",
+        type=parse_time,
+        default="1h",
+        help='Start time: "now", 15m, 6h, 7d, ISO date or Unix time (default: 1h)'
+    )
+    history.add_argument(
+        "--until",
+        type=parse_time,
+        default="now",
+        help="End time, same formats as --since (default: now)"
+    )
+    history.add_argument(
+        "--fields",
+        help="Comma-separated columns to print (default: all)"
+    )
+    history.add_argument(
+        "--store",
+        default=None,
+        help="History directory (default: ~/.local/share/arch-health/history)"
     )
 
     args = parser.parse_args()
 
-    if args.watch:
+    if args.profile:
+        from core import instrument
+        instrument.enable()
+        atexit.register(lambda: print(instrument.report(), file=sys.stderr))
+
+    if args.command == "daemon":
+        from main import daemon
+        try:
+            daemon(args.interval or DEFAULT_INTERVAL, record=args.record)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "export":
+        from ui.exporter import run_exporter
+        try:
+            run_exporter(args.interval or DEFAULT_INTERVAL, args.listen, args.port, args.unix)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "helper":
+        if os.geteuid() != 0:
+            parser.error("the helper must run as root; start it with sudo or pkexec")
+        from core.helperd import SOCKET_PATH, run_helper
+        try:
+            run_helper(args.socket or SOCKET_PATH)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "history":
+        if args.store is None:
+            from engine.store import STORE_DIR
+            args.store = STORE_DIR
+        show_history(args)
+    elif args.watch:
+        from main import watch
         try:
-            while True:
-                os.system("clear")
-                main()
-                time.sleep(args.interval)
+            watch(args.interval, record=args.record, names=args.only)
         except KeyboardInterrupt:
             print("\nExiting watch mode 👋")
     else:
-        main()
+        from main import main
+        main(names=args.only, as_json=args.json)
 
 # 🔴 THIS WAS MISSING — ABSOLUTELY REQUIRED
 if __name__ == "__main__":
@@ -1,33 +1,58 @@
 import psutil
 import os
 
+from core import instrument, sysfs
+from core.cache import CACHE
+
 POWER_SUPPLY_PATH = "/sys/class/power_supply"
 
+# Per-field TTLs in seconds (None = read once per process)
+FIELD_TTL = {
+    "energy_full": 300,
+    "energy_full_design": None,
+    "cycle_count": 300,
+}
+
+BAT_DIR_TTL = 60
+
 def read_sys_file(path):
+    return sysfs.read_str(path)
+
+
+def find_battery_dir():
     try:
-        with open(path, "r") as f:
-            return f.read().strip()
-    except Exception:
+        items = os.listdir(POWER_SUPPLY_PATH)
+    except Exception as e:
+        instrument.swallowed("battery.find_battery_dir", e)
         return None
 
+    for item in items:
+        if item.startswith("BAT"):
+            return os.path.join(POWER_SUPPLY_PATH, item)
+    return None
+
+
+def read_battery_field(bat_dir, field):
+    return CACHE.get(
+        f"battery.{field}:{bat_dir}",
+        lambda: read_sys_file(f"{bat_dir}/{field}"),
+        FIELD_TTL.get(field, 0)
+    )
+
 
 def get_battery_health():
     battery = psutil.sensors_battery()
     if not battery:
         return {"present": False}
 
-    bat_dir = None
-    for item in os.listdir(POWER_SUPPLY_PATH):
-        if item.startswith("BAT"):
-            bat_dir = os.path.join(POWER_SUPPLY_PATH, item)
-            break
+    bat_dir = CACHE.get("battery.dir", find_battery_dir, BAT_DIR_TTL)
 
     if not bat_dir:
         return {"present": False}
 
-    energy_full = read_sys_file(f"{bat_dir}/energy_full")
-    energy_full_design = read_sys_file(f"{bat_dir}/energy_full_design")
-    cycle_count = read_sys_file(f"{bat_dir}/cycle_count")
+    energy_full = read_battery_field(bat_dir, "energy_full")
+    energy_full_design = read_battery_field(bat_dir, "energy_full_design")
+    cycle_count = read_battery_field(bat_dir, "cycle_count")
 
     health = None
     wear = None
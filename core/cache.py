@@ -0,0 +1,91 @@
+import functools
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread-safe cache for slow-changing collector data.
+
+    Entries expire after a per-key TTL (None = never). Loads are
+    single-flight: while one caller runs the loader for a key, other
+    callers for the same key wait for its result instead of running
+    the same probe again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+        self._stats = {}
+
+    def get(self, key, loader, ttl=None):
+        while True:
+            with self._lock:
+                stats = self._stats.setdefault(key, {"hits": 0, "misses": 0})
+
+                entry = self._entries.get(key)
+                if entry and (entry[1] is None or entry[1] > time.monotonic()):
+                    stats["hits"] += 1
+                    return entry[0]
+
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    stats["misses"] += 1
+                    break
+
+            # Someone else is loading this key; wait and re-check
+            event.wait()
+
+        try:
+            value = loader()
+            expires = None if ttl is None else time.monotonic() + ttl
+            with self._lock:
+                self._entries[key] = (value, expires)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def invalidate(self, key=None):
+        """
+        Drop one key, or every key when called without arguments.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            keys = {k: dict(v) for k, v in self._stats.items()}
+        return {
+            "hits": sum(v["hits"] for v in keys.values()),
+            "misses": sum(v["misses"] for v in keys.values()),
+            "keys": keys,
+        }
+
+
+# Shared by every collector in core/
+CACHE = TTLCache()
+
+
+def cached(ttl=None, key=None):
+    """
+    Decorator for argument-less collectors: cache the return value
+    in CACHE under `key` (defaults to module.function) for `ttl` seconds.
+    """
+    def decorator(func):
+        cache_key = key or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper():
+            return CACHE.get(cache_key, func, ttl)
+
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
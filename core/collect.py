@@ -0,0 +1,139 @@
+import importlib
+import threading
+import time
+
+from core import instrument
+
+
+# -----------------------------
+# Collector registry
+# -----------------------------
+# "module:function" strings, imported on first use so a run that only
+# needs some collectors never pays for the others' imports (psutil,
+# subprocess probes, D-Bus, warm-up reads).
+COLLECTORS = {
+    "cpu": "core.cpu:get_cpu",
+    "memory": "core.memory:get_memory",
+    "temps": "core.temps:get_temperatures",
+    "ssd": "core.ssd:get_ssd_health",
+    "battery": "core.battery:get_battery_health",
+    "gpu": "core.gpu:get_gpu_health",
+    "services": "core.system:failed_units",
+    "processes": "core.processes:get_top_processes",
+}
+
+# Hard deadline per collector, in seconds from the start of the tick
+DEADLINES = {
+    "cpu": 2.0,
+    "memory": 1.0,
+    "temps": 1.0,
+    "ssd": 5.0,
+    "battery": 1.0,
+    "gpu": 3.0,
+    "services": 3.0,
+    "processes": 2.0,
+}
+
+DEFAULT_DEADLINE = 3.0
+
+
+def collector(name):
+    """
+    The collector function registered as `name`; raises KeyError for
+    unknown names.
+    """
+    target = COLLECTORS[name]
+    if callable(target):
+        return target
+
+    module, _, func = target.partition(":")
+    return getattr(importlib.import_module(module), func)
+
+
+class _Job:
+    """
+    One run of a collector on its own daemon thread.
+
+    A job that misses its deadline keeps running in the background;
+    its result is picked up by a later tick instead of starting a
+    second copy of the same probe.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            with instrument.stage(f"collector.{self.name}"):
+                self.result = collector(self.name)()
+            with _lock:
+                _last[self.name] = self.result
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+_lock = threading.Lock()
+_jobs = {}
+_last = {}
+
+
+def collect(names=None, deadlines=None):
+    """
+    Run collectors concurrently and return a snapshot dict.
+
+    Every collector gets its own deadline; one that misses it (or
+    raises) contributes its last good value, or None if it never
+    finished, and its name is listed under data["stale"].
+    """
+    names = list(names or COLLECTORS)
+    for name in names:
+        if name not in COLLECTORS:
+            raise ValueError(f"unknown collector: {name}")
+    deadlines = {**DEADLINES, **(deadlines or {})}
+    start = time.monotonic()
+
+    with _lock:
+        jobs = {}
+        for name in names:
+            job = _jobs.get(name)
+            if job is None or job.done.is_set():
+                job = _jobs[name] = _Job(name)
+            jobs[name] = job
+
+    data = {}
+    stale = []
+
+    # Wall time of the whole fan-out, from the caller's point of view
+    with instrument.stage("collect"):
+        for name, job in jobs.items():
+            remaining = start + deadlines.get(name, DEFAULT_DEADLINE) - time.monotonic()
+            if job.done.wait(max(remaining, 0)) and job.error is None:
+                data[name] = job.result
+            else:
+                with _lock:
+                    data[name] = _last.get(name)
+                stale.append(name)
+
+    data["stale"] = stale
+    return data
+
+
+def finished(names):
+    """
+    {name: result} for the collectors in `names` whose latest run has
+    since completed without error. Lets a caller pick up the result of
+    a job that missed its deadline without waiting for it.
+    """
+    with _lock:
+        jobs = {n: _jobs.get(n) for n in names}
+        return {
+            n: job.result for n, job in jobs.items()
+            if job is not None and job.done.is_set() and job.error is None
+        }
@@ -1,22 +1,163 @@
+import os
+import threading
 import psutil
 import platform
 
+from core import procfs, sysfs
+from core.cache import cached
 
-def get_cpu():
+PROC_STAT = "/proc/stat"
+
+# Column order of the "cpu" lines in /proc/stat (guest time is
+# already folded into user/nice, so it is left out of the total)
+STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+
+# Shortest window (seconds of CPU time per CPU) a delta is trusted for;
+# a few jiffies only ever read as 0% or 100%
+MIN_WINDOW = 0.1
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+class CpuSampler:
     """
-    Collect detailed CPU information for health monitoring.
+    Non-blocking CPU usage from /proc/stat counter deltas.
+
+    Every call to sample() compares the current counters with the ones
+    kept from the previous call, so nothing ever sleeps. The very first
+    sample is measured against warm_up(), or against boot when there is
+    no earlier reading or less than MIN_WINDOW has passed since it (a
+    one-shot run samples right after the import-time warm-up).
     """
 
-    freq = psutil.cpu_freq()
-    load1, load5, load15 = psutil.getloadavg()
+    def __init__(self, path=PROC_STAT):
+        self.path = path
+        self._lock = threading.Lock()
+        self._prev = None
+        self._last = None
+
+    def _read(self):
+        raw = sysfs.read_bytes(self.path)
+        if raw is None:
+            return None
+
+        rows = {}
+        for line in raw.split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break
+            name, *fields = line.split()
+            rows[name.decode()] = [int(x) for x in fields[:len(STAT_FIELDS)]]
+        return rows or None
+
+    def warm_up(self):
+        cur = self._read()
+        with self._lock:
+            self._prev = cur
+
+    def sample(self):
+        cur = self._read()
+        if cur is None:
+            return None
+
+        with self._lock:
+            prev = self._prev
+
+            # No earlier reading, or too short a window to mean anything:
+            # reuse the last result, or fall back to the since-boot average
+            if prev is None or _window(prev, cur) < MIN_WINDOW:
+                if self._last:
+                    return self._last
+                prev = {name: [0] * len(row) for name, row in cur.items()}
+
+            self._prev = cur
+
+            per_core = []
+            for name, row in cur.items():
+                if name != "cpu":
+                    per_core.append(_busy_percent(prev.get(name), row))
+
+            delta = _delta(prev.get("cpu"), cur["cpu"])
+            total = sum(delta) or 1
+
+            self._last = {
+                "total": _busy_percent(prev.get("cpu"), cur["cpu"]),
+                "per_core": per_core,
+                "modes": {
+                    "user": round((delta[0] + delta[1]) * 100 / total, 1),
+                    "system": round((delta[2] + delta[5] + delta[6]) * 100 / total, 1),
+                    "iowait": round(delta[4] * 100 / total, 1),
+                    "steal": round(delta[7] * 100 / total, 1),
+                },
+            }
+            return self._last
+
+
+def _window(prev, cur):
+    # Seconds covered by two readings, per CPU
+    cpus = max(len(cur) - 1, 1)
+    ticks = sum(cur["cpu"]) - sum(prev.get("cpu", ()))
+    return ticks / cpus / CLOCK_TICKS
+
 
+def _delta(prev, cur):
+    if not prev:
+        return list(cur)
+    return [max(c - p, 0) for p, c in zip(prev, cur)]
+
+
+def _busy_percent(prev, cur):
+    delta = _delta(prev, cur)
+    total = sum(delta)
+    if not total:
+        return 0.0
+    idle = delta[3] + (delta[4] if len(delta) > 4 else 0)
+    return round((total - idle) * 100 / total, 1)
+
+
+_sampler = CpuSampler()
+_sampler.warm_up()
+
+
+@cached(ttl=None)
+def get_cpu_static():
+    """
+    CPU facts that do not change while we run.
+    """
     return {
         "model": platform.processor(),
         "cores_logical": psutil.cpu_count(logical=True),
         "cores_physical": psutil.cpu_count(logical=False),
-        "usage_percent": psutil.cpu_percent(interval=1),
-        "frequency_mhz": round(freq.current, 2) if freq else None,
-        "frequency_max_mhz": round(freq.max, 2) if freq else None,
+    }
+
+
+def get_cpu():
+    """
+    Collect detailed CPU information for health monitoring.
+    """
+
+    # cpufreq through the sysfs pool; psutil falls back to /proc/cpuinfo
+    freq = procfs.cpu_freq()
+    if freq is None:
+        freq = psutil.cpu_freq()
+        freq = (freq.current, freq.max) if freq else None
+    # os.getloadavg(), a single libc call that beats parsing /proc/loadavg
+    load1, load5, load15 = psutil.getloadavg()
+
+    usage = _sampler.sample()
+    if usage is None:
+        usage = {
+            "total": psutil.cpu_percent(interval=None),
+            "per_core": psutil.cpu_percent(interval=None, percpu=True),
+            "modes": None,
+        }
+
+    return {
+        **get_cpu_static(),
+        "usage_percent": usage["total"],
+        "usage_per_core": usage["per_core"],
+        "usage_modes": usage["modes"],
+        "frequency_mhz": round(freq[0], 2) if freq else None,
+        "frequency_max_mhz": round(freq[1], 2) if freq else None,
         "load_avg": {
             "1min": round(load1, 2),
             "5min": round(load5, 2),
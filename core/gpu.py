@@ -1,70 +1,171 @@
+import atexit
 import subprocess
 import shutil
-import os
+import threading
 
-def run(cmd):
-    try:
-        return subprocess.check_output(cmd, text=True).strip()
-    except Exception:
-        return None
+from core import instrument, sysfs
+from core.cache import cached
 
 
 # -----------------------------
-# NVIDIA GPU
+# NVIDIA GPU (streaming)
 # -----------------------------
-def get_nvidia_gpu():
-    if not shutil.which("nvidia-smi"):
+NVIDIA_SMI = "nvidia-smi"
+NVIDIA_QUERY = "index,name,temperature.gpu,utilization.gpu,memory.used,memory.total,power.state"
+NVIDIA_INTERVAL_MS = 1000
+NVIDIA_RESTART_DELAY = 5
+
+# How long the very first call waits for the stream to report
+NVIDIA_FIRST_SAMPLE_TIMEOUT = 2
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except ValueError:
         return None
 
-    out = run([
-        "nvidia-smi",
-        "--query-gpu=name,temperature.gpu,utilization.gpu,memory.used,memory.total,power.state",
-        "--format=csv,noheader,nounits"
-    ])
 
-    if not out:
+def parse_nvidia_line(line):
+    fields = [f.strip() for f in line.split(",")]
+    if len(fields) != 7:
         return None
 
-    name, temp, util, mem_used, mem_total, pstate = out.split(", ")
+    index, name, temp, util, mem_used, mem_total, pstate = fields
+    if _int_or_none(index) is None:
+        return None
 
     return {
         "vendor": "NVIDIA",
-        "card": "card0",
+        "index": int(index),
+        "card": f"card{index}",
         "name": name,
-        "temperature": int(temp),
-        "utilization": int(util),
-        "vram_used_mb": int(mem_used),
-        "vram_total_mb": int(mem_total),
+        "temperature": _int_or_none(temp),
+        "utilization": _int_or_none(util),
+        "vram_used_mb": _int_or_none(mem_used),
+        "vram_total_mb": _int_or_none(mem_total),
         "power_state": pstate
     }
 
 
+class NvidiaStream:
+    """
+    One long-lived `nvidia-smi -lms` child feeding a latest-value slot.
+
+    A reader thread parses every CSV line (one per GPU per interval)
+    into self._latest keyed by GPU index. If the child dies, its data
+    is dropped and it is restarted after NVIDIA_RESTART_DELAY seconds.
+    """
+
+    def __init__(self, binary=NVIDIA_SMI, interval_ms=NVIDIA_INTERVAL_MS):
+        self.binary = binary
+        self.interval_ms = interval_ms
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._proc = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        proc = self._proc
+        if proc and proc.poll() is None:
+            proc.terminate()
+
+    def latest(self):
+        with self._lock:
+            return [self._latest[i] for i in sorted(self._latest)]
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            if shutil.which(self.binary):
+                self._read_child()
+
+            with self._lock:
+                self._latest.clear()
+            self.ready.set()
+            self._stopped.wait(NVIDIA_RESTART_DELAY)
+
+    def _read_child(self):
+        try:
+            self._proc = subprocess.Popen(
+                [
+                    self.binary,
+                    f"--query-gpu={NVIDIA_QUERY}",
+                    "--format=csv,noheader,nounits",
+                    "-lms", str(self.interval_ms)
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except Exception as e:
+            instrument.swallowed("gpu.nvidia_smi", e)
+            return
+
+        for line in self._proc.stdout:
+            gpu = parse_nvidia_line(line)
+            if gpu:
+                with self._lock:
+                    self._latest[gpu["index"]] = gpu
+                self.ready.set()
+
+        self._proc.wait()
+
+
+_nvidia = NvidiaStream()
+atexit.register(_nvidia.stop)
+
+
+def get_nvidia_gpus():
+    _nvidia.start()
+    _nvidia.ready.wait(NVIDIA_FIRST_SAMPLE_TIMEOUT)
+    return _nvidia.latest()
+
+
+def get_nvidia_gpu():
+    gpus = get_nvidia_gpus()
+    return gpus[0] if gpus else None
+
+
 # -----------------------------
 # Intel GPU (card1 confirmed)
 # -----------------------------
+INTEL_CARD = "/sys/class/drm/card1"
+
+
+@cached(ttl=None)
+def is_intel_gpu():
+    return sysfs.read_str(f"{INTEL_CARD}/device/vendor") == "0x8086"
+
+
 def get_intel_gpu():
-    base = "/sys/class/drm/card1"
+    base = INTEL_CARD
 
-    try:
-        with open(f"{base}/device/vendor") as f:
-            if f.read().strip() != "0x8086":
-                return None
-    except Exception:
+    if not is_intel_gpu():
         return None
 
-    freq = run(["cat", f"{base}/gt_cur_freq_mhz"])
-    max_freq = run(["cat", f"{base}/gt_max_freq_mhz"])
-
     return {
         "vendor": "Intel",
         "card": "card1",
-        "frequency_mhz": int(freq) if freq else None,
-        "max_frequency_mhz": int(max_freq) if max_freq else None
+        "frequency_mhz": sysfs.read_int(f"{base}/gt_cur_freq_mhz"),
+        "max_frequency_mhz": sysfs.read_int(f"{base}/gt_max_freq_mhz")
     }
 
 
 def get_gpu_health():
+    gpus = get_nvidia_gpus()
     return {
         "intel": get_intel_gpu(),
-        "nvidia": get_nvidia_gpu()
+        "nvidia": gpus[0] if gpus else None,
+        "nvidia_gpus": gpus
     }
@@ -0,0 +1,140 @@
+import itertools
+import json
+import socket
+import threading
+
+from core import instrument
+
+SOCKET_PATH = "/run/arch-health/helper.sock"
+
+# Longest request line the helper accepts, in bytes
+MAX_REQUEST = 4096
+
+# How long one smartctl run may take
+SMART_TIMEOUT = 30
+
+# How long a client waits for one answer
+REQUEST_TIMEOUT = SMART_TIMEOUT + 5
+
+
+class HelperError(Exception):
+    """
+    The helper refused or failed a request.
+    """
+
+
+class HelperUnavailable(HelperError):
+    """
+    No helper is running, or the connection to it was lost.
+    """
+
+
+class HelperClient:
+    """
+    One persistent connection to the privileged helper (core/helperd.py),
+    shared by every thread.
+
+    Requests carry an id, so several may be in flight at once (the
+    SMART probes of all disks run in parallel); a reader thread hands
+    each answer to the caller waiting for it. Calls raise
+    HelperUnavailable while no helper is running, and reconnect on the
+    next call after it (re)starts.
+    """
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sock = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        # Called with self._lock held
+        if self._sock is not None:
+            return self._sock
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise HelperUnavailable(str(e)) from e
+
+        self._sock = sock
+        threading.Thread(target=self._read_loop, args=(sock,), daemon=True).start()
+        return sock
+
+    def _read_loop(self, sock):
+        try:
+            with sock.makefile("rb") as f:
+                for line in f:
+                    answer = json.loads(line)
+                    with self._lock:
+                        waiter = self._pending.pop(answer.get("id"), None)
+                    if waiter:
+                        waiter[1] = answer
+                        waiter[0].set()
+        except (OSError, ValueError) as e:
+            instrument.swallowed("helper.read", e)
+
+        # Connection gone: wake everyone still waiting on it
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+            pending, self._pending = self._pending, {}
+        for event, _ in pending.values():
+            event.set()
+        sock.close()
+
+    def request(self, op, **args):
+        """
+        Send one request and return the helper's output.
+        """
+        waiter = [threading.Event(), None]
+        with self._lock:
+            sock = self._connect()
+            request_id = next(self._ids)
+            self._pending[request_id] = waiter
+            try:
+                sock.sendall(json.dumps({"id": request_id, "op": op, **args}).encode() + b"\n")
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                self._sock = None
+                _shutdown(sock)
+                raise HelperUnavailable(str(e)) from e
+
+        if not waiter[0].wait(REQUEST_TIMEOUT):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise HelperUnavailable("no answer from helper")
+
+        answer = waiter[1]
+        if answer is None:
+            raise HelperUnavailable("helper connection lost")
+        if not answer.get("ok"):
+            raise HelperError(answer.get("error"))
+        return answer["output"]
+
+    def close(self):
+        with self._lock:
+            sock, self._sock = self._sock, None
+        if sock:
+            _shutdown(sock)
+
+
+def _shutdown(sock):
+    # Wakes the reader thread, which closes the socket
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+_client = HelperClient()
+
+
+def smartctl(device, json_output=True):
+    """
+    `smartctl [--json] -a device` output from the helper.
+    """
+    return _client.request("smart", device=device, json=json_output)
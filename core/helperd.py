@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import stat
+import struct
+
+from core.helper import MAX_REQUEST, SMART_TIMEOUT, SOCKET_PATH
+
+# Concurrent smartctl runs
+SMART_WORKERS = 4
+
+# pid, uid, gid of the peer of a Unix socket
+_PEERCRED = struct.Struct("3i")
+
+
+class Helper:
+    """
+    Long-running root process answering a fixed set of requests over a
+    Unix socket, so the unprivileged CLI, GUI and daemon never escalate
+    privileges themselves.
+
+    Requests and answers are JSON lines carrying an id; requests on
+    one connection run concurrently and are answered as they finish.
+    Only root and `owner` (the user who started the helper) may
+    connect, checked with SO_PEERCRED on top of the owner-only socket.
+    The request set is closed:
+        {"op": "smart", "device": "/dev/nvme0n1", "json": true}
+    """
+
+    def __init__(self, path=SOCKET_PATH, owner=None):
+        self.path = path
+        self.owner = owner
+        self.smartctl = shutil.which("smartctl")
+        self.slots = asyncio.Semaphore(SMART_WORKERS)
+
+    async def _smart(self, request):
+        from core.ssd import DISK_NAME
+
+        device = request.get("device")
+        if (
+            not isinstance(device, str)
+            or os.path.dirname(device) != "/dev"
+            or not DISK_NAME.match(os.path.basename(device))
+            or not stat.S_ISBLK(os.stat(device).st_mode)
+        ):
+            raise ValueError(f"device not allowed: {device!r}")
+        if not self.smartctl:
+            raise FileNotFoundError("smartctl is not installed")
+
+        args = [self.smartctl, "-a", device]
+        if request.get("json", True):
+            args.insert(1, "--json")
+
+        async with self.slots:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                out, _ = await asyncio.wait_for(proc.communicate(), SMART_TIMEOUT)
+            except BaseException:
+                # Timed out, or the client hung up and the task was cancelled
+                if proc.returncode is None:
+                    proc.kill()
+                raise
+        return out.decode(errors="replace")
+
+    async def _answer(self, line, writer, lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request.get("op")
+            if op == "smart":
+                answer = {"ok": True, "output": await self._smart(request)}
+            else:
+                raise ValueError(f"unknown op: {op!r}")
+        except Exception as e:
+            answer = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        answer["id"] = request_id
+        async with lock:
+            writer.write(json.dumps(answer).encode() + b"\n")
+            await writer.drain()
+
+    async def _handle(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        _, uid, _ = _PEERCRED.unpack(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+        )
+        if uid not in (0, self.owner):
+            writer.close()
+            return
+
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # Longer than MAX_REQUEST: not one of ours
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(self._answer(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o755, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        # Created 0600 (never briefly world-accessible), then handed to the owner
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self._handle, self.path, limit=MAX_REQUEST)
+        finally:
+            os.umask(umask)
+        if self.owner:
+            os.chown(self.path, self.owner, -1)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            os.unlink(self.path)
+
+
+def run_helper(path=SOCKET_PATH):
+    """
+    Serve until interrupted. The invoking user comes from pkexec or
+    sudo; without either, only root may connect.
+    """
+    owner = os.environ.get("PKEXEC_UID") or os.environ.get("SUDO_UID")
+    asyncio.run(Helper(path, int(owner) if owner else None).serve())
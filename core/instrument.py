@@ -0,0 +1,256 @@
+import contextlib
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+# Upper bounds of the latency buckets in ms (50 µs doubling to ~100 s)
+BUCKETS = tuple(0.05 * 2 ** i for i in range(22))
+
+# Samples kept per histogram; older ones roll out
+WINDOW = 512
+
+# Events and swallowed exceptions outside any stage land here
+UNATTRIBUTED = "(unattributed)"
+
+ENABLED = False
+
+_NULL = contextlib.nullcontext()
+
+
+class Histogram:
+    """
+    Latency histogram over the last WINDOW samples.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.recent = deque(maxlen=window)
+
+    def add(self, ms):
+        if len(self.recent) == self.recent.maxlen:
+            self.counts[self.recent[0][0]] -= 1
+        bucket = bisect_left(BUCKETS, ms)
+        self.recent.append((bucket, ms))
+        self.counts[bucket] += 1
+
+    def percentile(self, q):
+        """
+        Upper bound of the bucket holding the q-th percentile (capped
+        at the largest sample), or None without samples.
+        """
+        if not self.recent:
+            return None
+        rank = q / 100 * len(self.recent)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                bound = BUCKETS[bucket] if bucket < len(BUCKETS) else float("inf")
+                return min(bound, self.max())
+        return self.max()
+
+    def max(self):
+        return max(ms for _, ms in self.recent) if self.recent else None
+
+    def snapshot(self):
+        samples = [ms for _, ms in self.recent]
+        return {
+            "samples": len(samples),
+            "mean_ms": sum(samples) / len(samples) if samples else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max(),
+            "buckets": {
+                (BUCKETS[i] if i < len(BUCKETS) else "inf"): c
+                for i, c in enumerate(self.counts) if c
+            },
+        }
+
+
+class StageStats:
+    """
+    Counters for one named stage (a collector, scoring, rendering).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = Counter()
+        self.wall = Histogram()
+        self.cpu_ms = 0.0
+        self.spawns = Counter()
+        self.opens = 0
+        self.swallowed = Counter()
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "wall": self.wall.snapshot(),
+            "cpu_ms": self.cpu_ms,
+            "spawns": dict(self.spawns),
+            "opens": self.opens,
+            "errors": dict(self.errors),
+            "swallowed": dict(self.swallowed),
+        }
+
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+_hooked = False
+
+
+def _stage_stats(name):
+    st = _stats.get(name)
+    if st is None:
+        st = _stats[name] = StageStats()
+    return st
+
+
+def _current():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else UNATTRIBUTED
+
+
+def _audit(event, args):
+    # Called for every audit event in the process: keep it tiny
+    if not ENABLED or (event != "open" and event != "subprocess.Popen"):
+        return
+    with _lock:
+        st = _stage_stats(_current())
+        if event == "open":
+            st.opens += 1
+        else:
+            # (executable, args, cwd, env); executable is usually None
+            exe = args[0] or (args[1] if isinstance(args[1], (str, bytes)) else args[1][0])
+            st.spawns[os.path.basename(os.fsdecode(exe))] += 1
+
+
+class _Stage:
+    __slots__ = ("name", "wall", "cpu")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = (time.perf_counter() - self.wall) * 1000
+        cpu = (time.thread_time() - self.cpu) * 1000
+        _local.stack.pop()
+        with _lock:
+            st = _stage_stats(self.name)
+            st.calls += 1
+            st.wall.add(wall)
+            st.cpu_ms += cpu
+            if exc_type is not None:
+                st.errors[exc_type.__name__] += 1
+        return False
+
+
+def stage(name):
+    """
+    Context manager timing one run of `name`; a no-op unless enabled.
+
+    Wall time goes into the stage's histogram, CPU time is the calling
+    thread's, and files opened / processes spawned by this thread while
+    the stage is active are counted against it.
+    """
+    return _Stage(name) if ENABLED else _NULL
+
+
+def bind(fn):
+    """
+    Wrap `fn` so it runs inside the caller's current stage, for work
+    handed to a thread pool.
+    """
+    if not ENABLED:
+        return fn
+    name = _current()
+
+    def run(*args, **kwargs):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stack.pop()
+
+    return run
+
+
+def swallowed(site, exc):
+    """
+    Record an exception that `site` caught and did not re-raise.
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        _stage_stats(_current()).swallowed[f"{site}: {type(exc).__name__}"] += 1
+
+
+def enable():
+    """
+    Start recording. The audit hook is installed on first use and
+    cannot be removed, but it returns at once while disabled.
+    """
+    global ENABLED, _hooked
+    with _lock:
+        if not _hooked:
+            sys.addaudithook(_audit)
+            _hooked = True
+        ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def stats():
+    """
+    {stage: counters} for every stage seen since enable()/reset().
+    """
+    with _lock:
+        return {name: st.snapshot() for name, st in sorted(_stats.items())}
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def report():
+    """
+    Per-stage breakdown as a text table.
+    """
+    header = f"{'stage':<28}{'calls':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'cpu ms':>10}{'opens':>7}  spawns / errors"
+    lines = [header, "-" * len(header)]
+
+    for name, st in stats().items():
+        wall = st["wall"]
+        notes = [f"{exe}×{n}" for exe, n in st["spawns"].items()]
+        notes += [f"raised {err}×{n}" for err, n in st["errors"].items()]
+        notes += [f"swallowed {site}×{n}" for site, n in st["swallowed"].items()]
+        lines.append(
+            f"{name:<28}{st['calls']:>6}{_ms(wall['p50_ms']):>10}{_ms(wall['p95_ms']):>10}"
+            f"{_ms(wall['max_ms']):>10}{st['cpu_ms']:>10.2f}{st['opens']:>7}  {', '.join(notes)}"
+        )
+
+    return "\n".join(lines)
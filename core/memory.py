@@ -1,19 +1,33 @@
-import psutil
+from core import procfs
+
+
+def _from_psutil():
+    """
+    Fallback for hosts without a readable /proc/meminfo.
+    """
+    import psutil
 
-def get_memory():
     mem = psutil.virtual_memory()
     swap = psutil.swap_memory()
+    return (
+        {"total": mem.total, "used": mem.used, "available": mem.available, "percent": mem.percent},
+        {"total": swap.total, "used": swap.used, "percent": swap.percent},
+    )
+
+
+def get_memory():
+    ram, swap = procfs.memory() or _from_psutil()
 
     return {
         "ram": {
-            "total_gb": round(mem.total / 1024**3, 2),
-            "used_gb": round(mem.used / 1024**3, 2),
-            "available_gb": round(mem.available / 1024**3, 2),
-            "percent": mem.percent
+            "total_gb": round(ram["total"] / 1024**3, 2),
+            "used_gb": round(ram["used"] / 1024**3, 2),
+            "available_gb": round(ram["available"] / 1024**3, 2),
+            "percent": ram["percent"]
         },
         "swap": {
-            "total_gb": round(swap.total / 1024**3, 2),
-            "used_gb": round(swap.used / 1024**3, 2),
-            "percent": swap.percent
+            "total_gb": round(swap["total"] / 1024**3, 2),
+            "used_gb": round(swap["used"] / 1024**3, 2),
+            "percent": swap["percent"]
         }
     }
@@ -0,0 +1,96 @@
+import heapq
+import threading
+import time
+
+import psutil
+
+# Processes reported per ranking
+TOP_K = 5
+
+# Only these are read per process, inside one oneshot() each
+ATTRS = ["name", "create_time", "cpu_times", "memory_info", "io_counters"]
+
+
+class ProcessSampler:
+    """
+    Top-K processes by CPU, resident memory and disk I/O.
+
+    psutil.process_iter() hands back the same Process objects from one
+    call to the next (and drops them when a pid is reused), so every
+    tick is one pass over /proc reading just ATTRS. CPU and I/O rates
+    are deltas of the cumulative counters kept from the previous tick
+    (keyed by pid and start time, so a reused pid starts afresh), so
+    nothing sleeps; a process seen for the first time reports its
+    average CPU since it started (and no I/O rate) instead. Selection
+    uses heapq.nlargest, which keeps a K-sized heap instead of sorting
+    every process.
+    """
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._prev = {}
+        self._prev_time = None
+
+    def sample(self):
+        with self._lock:
+            now = time.monotonic()
+            wall = time.time()
+            elapsed = now - self._prev_time if self._prev_time else None
+            prev = self._prev
+            cur = {}
+            rows = []
+
+            for proc in psutil.process_iter(ATTRS, ad_value=None):
+                info = proc.info
+                times = info["cpu_times"]
+                mem = info["memory_info"]
+                io = info["io_counters"]
+                if times is None or mem is None:
+                    continue
+
+                cpu_total = times.user + times.system
+                io_total = io.read_bytes + io.write_bytes if io else None
+                key = (proc.pid, info["create_time"])
+                cur[key] = (cpu_total, io_total)
+
+                cpu_percent = io_rate = 0.0
+                before = prev.get(key)
+                if before and elapsed:
+                    cpu_percent = max(cpu_total - before[0], 0) / elapsed * 100
+                    if io_total is not None and before[1] is not None:
+                        io_rate = max(io_total - before[1], 0) / elapsed
+                elif info["create_time"] and wall > info["create_time"]:
+                    cpu_percent = cpu_total / (wall - info["create_time"]) * 100
+
+                rows.append((proc.pid, info["name"], cpu_percent, mem.rss, io_rate))
+
+            # Forget exited processes
+            self._prev = cur
+            self._prev_time = now
+
+        def top(index):
+            return [
+                {
+                    "pid": pid,
+                    "name": name,
+                    "cpu_percent": round(cpu, 1),
+                    "rss_mb": round(rss / 1024**2, 1),
+                    "io_kbps": round(io / 1024, 1),
+                }
+                for pid, name, cpu, rss, io in heapq.nlargest(self.top_k, rows, key=lambda r: r[index])
+            ]
+
+        return {
+            "count": len(rows),
+            "top_cpu": top(2),
+            "top_memory": top(3),
+            "top_io": top(4),
+        }
+
+
+_sampler = ProcessSampler()
+
+
+def get_top_processes():
+    return _sampler.sample()
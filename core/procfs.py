@@ -0,0 +1,130 @@
+import glob
+import re
+import threading
+
+from core import instrument, sysfs
+
+MEMINFO = "/proc/meminfo"
+CPUFREQ_PATH = "/sys/devices/system/cpu"
+
+# Only the /proc/meminfo fields get_memory() needs, in kB
+MEMINFO_FIELDS = re.compile(
+    rb"^(MemTotal|MemFree|MemAvailable|SwapTotal|SwapFree):\s+(\d+)",
+    re.MULTILINE,
+)
+
+
+def _percent(used, total):
+    # Same rounding as psutil's usage_percent()
+    return round(used / total * 100, 1) if total else 0.0
+
+
+def _parse_meminfo(raw):
+    return {key: int(kb) * 1024 for key, kb in MEMINFO_FIELDS.findall(raw)}
+
+
+def memory():
+    """
+    (ram, swap) byte counts from one read of /proc/meminfo, computed
+    the way psutil.virtual_memory() and swap_memory() (7.x) do, or None
+    when the file or a field we need is missing. Kernels without a
+    usable MemAvailable are left to psutil's estimate.
+    """
+    fields = sysfs.parse(MEMINFO, _parse_meminfo)
+    if fields is None:
+        return None
+    try:
+        total = fields[b"MemTotal"]
+        free = fields[b"MemFree"]
+        available = fields[b"MemAvailable"]
+        swap_total = fields[b"SwapTotal"]
+        swap_free = fields[b"SwapFree"]
+    except KeyError as e:
+        instrument.swallowed("procfs.meminfo", e)
+        return None
+
+    if not available:
+        return None
+    if available > total:
+        # LXC containers can report the host's figures
+        available = free
+    used = total - available
+    swap_used = swap_total - swap_free
+
+    ram = {
+        "total": total,
+        "used": used,
+        "available": available,
+        "percent": _percent(used, total),
+    }
+    swap = {
+        "total": swap_total,
+        "used": swap_used,
+        "percent": _percent(swap_used, swap_total),
+    }
+    return ram, swap
+
+
+class CpuFreq:
+    """
+    Average current and maximum frequency over the cpufreq policies.
+
+    The policy directories and their scaling_max_freq limits are read
+    once; every later read is one pooled pread per scaling_cur_freq
+    file.
+    """
+
+    def __init__(self, root=CPUFREQ_PATH):
+        self.root = root
+        self._lock = threading.Lock()
+        self._policies = None
+
+    def rescan(self):
+        with self._lock:
+            self._policies = None
+
+    def _scan(self):
+        # Same lookup order as psutil.cpu_freq()
+        dirs = sorted(glob.glob(f"{self.root}/cpufreq/policy[0-9]*"))
+        if not dirs:
+            dirs = sorted(glob.glob(f"{self.root}/cpu[0-9]*/cpufreq"))
+
+        policies = []
+        for d in dirs:
+            maximum = sysfs.read_int(f"{d}/scaling_max_freq")
+            if maximum is None:
+                return []
+            policies.append((f"{d}/scaling_cur_freq", maximum))
+        return policies
+
+    def read(self):
+        """
+        (current_mhz, max_mhz), or None without readable cpufreq files.
+        """
+        with self._lock:
+            if self._policies is None:
+                self._policies = self._scan()
+            policies = self._policies
+
+        if not policies:
+            return None
+
+        current = maximum = 0
+        for path, top in policies:
+            cur = sysfs.read_int(path)
+            if cur is None:
+                # CPU went offline: rescan next time, psutil covers this one
+                self.rescan()
+                return None
+            current += cur
+            maximum += top
+
+        # kHz, averaged over policies
+        return current / len(policies) / 1000, maximum / len(policies) / 1000
+
+
+_freq = CpuFreq()
+
+
+def cpu_freq():
+    return _freq.read()
@@ -0,0 +1,250 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+SHM_NAME = "arch-health"
+SHM_SIZE = 1 << 20
+
+# Readers open the segment directly so they only ever need read access
+SHM_PATH = f"/dev/shm/{SHM_NAME}"
+
+# A snapshot older than this many publishing intervals is ignored and
+# the reader collects itself
+MAX_MISSED = 2
+
+# Cutoff in seconds when the header carries no interval
+MAX_AGE = 10
+
+# seq, published (Unix time), payload length, publishing interval
+_HEADER = struct.Struct("<QdId")
+_PAYLOAD = 64
+
+
+class SnapshotPublisher:
+    """
+    Writes the latest snapshot into a shared-memory segment.
+
+    Writes are guarded by a sequence counter (odd while a write is in
+    progress), so readers never see a half-written payload and never
+    need a lock. The segment is made world-readable so one privileged
+    daemon can serve any number of unprivileged readers. The header
+    carries the publishing `interval`, from which readers judge when
+    the daemon has stopped.
+    """
+
+    def __init__(self, name=SHM_NAME, size=SHM_SIZE, interval=0):
+        from multiprocessing import shared_memory
+
+        # Always a fresh segment (created with O_EXCL): one left behind
+        # by a crashed daemon, or planted by another user who could keep
+        # writing to it through their own mapping, is unlinked first
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            os.unlink(f"/dev/shm/{name}")
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        os.chmod(f"/dev/shm/{name}", 0o644)
+        self.seq = 0
+        self.interval = interval
+
+    def publish(self, data, score, issues):
+        payload = json.dumps(
+            {"data": data, "score": score, "issues": issues},
+            separators=(",", ":")
+        ).encode()
+        if _PAYLOAD + len(payload) > self.shm.size:
+            return False
+
+        buf = self.shm.buf
+        self.seq += 1
+        _HEADER.pack_into(buf, 0, self.seq, 0.0, 0, self.interval)
+        buf[_PAYLOAD:_PAYLOAD + len(payload)] = payload
+        self.seq += 1
+        _HEADER.pack_into(buf, 0, self.seq, time.time(), len(payload), self.interval)
+        return True
+
+    def close(self, unlink=True):
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SnapshotReader:
+    """
+    Read-only view of the daemon's segment; reattaches when the daemon
+    restarts.
+
+    Only a segment owned by root (the daemon) or by this user is
+    trusted; anyone else's is treated as no daemon at all.
+    """
+
+    def __init__(self, path=SHM_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._map = None
+        self._inode = None
+
+    def _attach(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._detach()
+            return None
+
+        if self._map is None or st.st_ino != self._inode:
+            self._detach()
+            try:
+                with open(self.path, "rb") as f:
+                    # Checked on the open file, not the path we stat'ed
+                    st = os.fstat(f.fileno())
+                    if st.st_uid not in (0, os.geteuid()):
+                        return None
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._inode = st.st_ino
+            except (OSError, ValueError):
+                return None
+        return self._map
+
+    def _detach(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._inode = None
+
+    def read(self, max_age=None):
+        """
+        Return {"seq", "time", "data", "score", "issues"}, or None when
+        no daemon has published a snapshot within max_age seconds. By
+        default that is MAX_MISSED of the daemon's publishing intervals
+        (MAX_AGE when the header does not give one).
+        """
+        with self._lock:
+            m = self._attach()
+            if m is None:
+                return None
+
+            for _ in range(100):
+                seq, published, length, interval = _HEADER.unpack_from(m)
+                if seq & 1:
+                    time.sleep(0)
+                    continue
+                payload = m[_PAYLOAD:_PAYLOAD + length]
+                if _HEADER.unpack_from(m)[0] == seq:
+                    break
+            else:
+                return None
+
+        if max_age is None:
+            max_age = MAX_MISSED * interval if interval > 0 else MAX_AGE
+        if not seq or time.time() - published > max_age:
+            return None
+
+        snapshot = json.loads(payload)
+        snapshot["seq"] = seq // 2
+        snapshot["time"] = published
+        return snapshot
+
+
+_reader = SnapshotReader()
+read_snapshot = _reader.read
+
+
+def current_snapshot(max_age=None, names=None, engine=None):
+    """
+    (data, score, issues) from the daemon when one is publishing,
+    otherwise collected and scored in this process.
+
+    With `names`, only those collectors are reported (and run, when
+    collecting locally); the score then covers just those sections.
+    Local scoring is stateless unless a long-running caller passes its
+    RuleEngine as `engine`.
+    """
+    snapshot = read_snapshot(max_age)
+    if snapshot and names is None:
+        return snapshot["data"], snapshot["score"], snapshot["issues"]
+
+    if snapshot:
+        data = {k: v for k, v in snapshot["data"].items() if k in names}
+        data["stale"] = [n for n in snapshot["data"].get("stale", ()) if n in names]
+    else:
+        from core.collect import collect
+        data = collect(names)
+
+    from engine.rules import calculate_health
+
+    score, issues = calculate_health(data, engine)
+    return data, score, issues
+
+
+class LiveSnapshot:
+    """
+    A snapshot kept current by partial refreshes.
+
+    refresh(due) returns the daemon's snapshot when one is publishing;
+    otherwise it runs only the `due` collectors, merges their results
+    into the previous snapshot and re-scores just the affected rules.
+    Collectors that missed their deadline stay listed in data["stale"]
+    across ticks, and their late results are merged as soon as they
+    land instead of waiting for their next slot. Every new snapshot is
+    recorded in `history`, and a daemon snapshot is scored only once
+    however many ticks read it. Used by the adaptive watch loop and the
+    GUI.
+    """
+
+    def __init__(self, names=None, max_age=None):
+        from engine.anomaly import AnomalyDetector
+        from engine.history import MetricHistory
+        from engine.rules import RuleEngine, configured_rules
+
+        self.names = names
+        self.max_age = max_age
+        self.engine = RuleEngine(configured_rules(), anomalies=AnomalyDetector())
+        self.history = MetricHistory()
+        # Publish time of the last daemon snapshot scored
+        self.published = None
+        self.data = {}
+        self.stale = set()
+        self.score = None
+        self.issues = []
+
+    def refresh(self, due):
+        snapshot = read_snapshot(self.max_age)
+        if snapshot and snapshot["time"] == self.published:
+            # Same snapshot as last tick: scoring it again would weight
+            # this one sample twice in the anomaly baselines
+            return dict(self.data), self.score, self.issues
+        if snapshot:
+            data = snapshot["data"]
+            if self.names is not None:
+                data = {k: v for k, v in data.items() if k in self.names}
+                data["stale"] = [n for n in snapshot["data"].get("stale", ()) if n in self.names]
+            # Keep the engine in step so a local refresh can take over
+            score, issues = self.engine.evaluate(data)
+            if self.names is None:
+                score, issues = snapshot["score"], snapshot["issues"]
+            self.data = data
+            self.stale = set()
+            self.published = snapshot["time"]
+            self.history.record(data, score, snapshot["time"])
+        else:
+            from core.collect import collect, finished
+
+            partial = collect(due)
+            missed = set(partial.pop("stale"))
+            late = finished(self.stale - set(partial))
+            partial.update(late)
+            self.stale = (self.stale - set(partial) - set(late)) | missed
+            partial["stale"] = sorted(self.stale)
+            self.data.update(partial)
+            score, issues = self.engine.update(partial)
+            self.published = None
+            self.history.record(self.data, score)
+
+        self.score, self.issues = score, issues
+        return dict(self.data), score, issues
@@ -0,0 +1,177 @@
+import importlib
+import math
+import time
+from collections import deque
+
+
+def ticks(interval, clock=time.monotonic, sleep=time.sleep):
+    """
+    Yield the scheduled time of each tick, `interval` seconds apart on
+    a fixed monotonic grid.
+
+    The wait is computed from the grid rather than from the end of the
+    previous tick, so collection time does not add to the period. A
+    tick that overruns skips the slots it missed instead of firing
+    them back to back.
+    """
+    next_tick = clock()
+
+    while True:
+        yield next_tick
+
+        next_tick += interval
+        now = clock()
+        if now > next_tick:
+            next_tick += ((now - next_tick) // interval + 1) * interval
+
+        sleep(max(next_tick - clock(), 0))
+
+
+# Base refresh period of each collector, in seconds
+CADENCE = {
+    "cpu": 1,
+    "memory": 1,
+    "temps": 2,
+    "gpu": 2,
+    "battery": 30,
+    "ssd": 600,
+    # Event-driven while the systemd D-Bus watcher is connected (see
+    # EVENTS); this is the safety poll for the systemctl fallback
+    "services": 60,
+    "processes": 2,
+}
+
+DEFAULT_CADENCE = 2
+
+# "module:function" returning a token that changes whenever the source
+# has news; a new token makes the collector due at the next wake-up
+EVENTS = {
+    "services": "core.system:failed_units_version",
+}
+
+# Jobs due within this many seconds of a wake-up are run in it
+COALESCE = 0.25
+
+# Interval multipliers on battery power and when the CPU is idle
+BATTERY_STRETCH = 2.0
+IDLE_STRETCH = 2.0
+MAX_STRETCH = 4.0
+IDLE_CPU_PERCENT = 5
+
+# Wake-ups the monitor's own CPU usage is averaged over
+SELF_CPU_WINDOW = 10
+
+
+def _resolve(target):
+    if callable(target):
+        return target
+    module, _, func = target.partition(":")
+    return getattr(importlib.import_module(module), func)
+
+
+class AdaptiveScheduler:
+    """
+    Per-collector cadences merged into shared wake-ups.
+
+    Every collector has its own period (CADENCE) on a grid anchored at
+    a common origin, and a wake-up runs all jobs due within COALESCE
+    seconds of it, so 1 s and 2 s jobs share one wake-up instead of
+    two. observe() stretches every period while the laptop is on
+    battery or the CPU is idle. Iterating yields the due names on each
+    wake-up and sleeps in between; GUIs drive due() and next_wakeup()
+    from their own timer instead.
+    """
+
+    def __init__(self, names=None, cadence=CADENCE, events=EVENTS,
+                 clock=time.monotonic, sleep=time.sleep, cpu_clock=time.process_time):
+        names = list(names or cadence)
+        self.cadence = {n: cadence.get(n, DEFAULT_CADENCE) for n in names}
+        self.events = {n: _resolve(t) for n, t in events.items() if n in self.cadence}
+        self.clock = clock
+        self.sleep = sleep
+        self.cpu_clock = cpu_clock
+
+        self.stretch = 1.0
+        self.reasons = []
+        self.wakeups = 0
+
+        self._origin = clock()
+        self._next = {n: self._origin for n in self.cadence}
+        self._tokens = {}
+        self._cpu = deque(maxlen=SELF_CPU_WINDOW + 1)
+
+    def next_wakeup(self):
+        return min(self._next.values())
+
+    def due(self):
+        """
+        Names to refresh now, and advance their schedule. Empty when
+        called before anything is due.
+        """
+        now = self.clock()
+        self.wakeups += 1
+        self._cpu.append((now, self.cpu_clock()))
+
+        due = [n for n, t in self._next.items() if t <= now + COALESCE]
+        for name in due:
+            # Next slot on a grid shared by all jobs, so periods that are
+            # multiples of each other keep landing on the same wake-ups;
+            # missed slots are skipped instead of fired back to back
+            step = self.cadence[name] * self.stretch
+            self._next[name] = self._origin + (math.floor((now - self._origin) / step) + 1) * step
+
+        for name, token_of in self.events.items():
+            token = token_of()
+            prev = self._tokens.get(name)
+            self._tokens[name] = token
+            if token is not None and prev is not None and token != prev and name not in due:
+                due.append(name)
+
+        return due
+
+    def observe(self, data):
+        """
+        Re-derive the stretch factor from the latest snapshot.
+        """
+        stretch = 1.0
+        reasons = []
+
+        battery = data.get("battery") or {}
+        if battery.get("present") and battery.get("plugged") is False:
+            stretch *= BATTERY_STRETCH
+            reasons.append("on battery")
+
+        usage = (data.get("cpu") or {}).get("usage_percent")
+        if usage is not None and usage < IDLE_CPU_PERCENT:
+            stretch *= IDLE_STRETCH
+            reasons.append("idle")
+
+        self.stretch = min(stretch, MAX_STRETCH)
+        self.reasons = reasons
+
+    def self_cpu_percent(self):
+        """
+        CPU used by this process (all threads) over the last wake-ups,
+        as a percentage of one core.
+        """
+        if len(self._cpu) < 2:
+            return None
+        (wall0, cpu0), (wall1, cpu1) = self._cpu[0], self._cpu[-1]
+        if wall1 <= wall0:
+            return None
+        return round((cpu1 - cpu0) / (wall1 - wall0) * 100, 1)
+
+    def status(self):
+        return {
+            "cpu_percent": self.self_cpu_percent(),
+            "stretch": self.stretch,
+            "reasons": list(self.reasons),
+            "wakeups": self.wakeups,
+        }
+
+    def __iter__(self):
+        while True:
+            due = self.due()
+            if due:
+                yield due
+            self.sleep(max(self.next_wakeup() - self.clock(), 0))
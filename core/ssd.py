@@ -1,24 +1,78 @@
+import json
+import os
 import subprocess
 import re
+from concurrent.futures import ThreadPoolExecutor
 
+from core import helper, instrument, sysfs
+from core.cache import cached
+
+SYS_BLOCK = "/sys/block"
+
+# Used when /sys/block cannot be listed
 NVME_DEVICE = "/dev/nvme0n1"
 
+# Whole NVMe namespaces and SATA/SAS disks; partitions, loop, dm and
+# zram devices are skipped, and so are removable media (USB sticks,
+# card readers)
+DISK_NAME = re.compile(r"^(nvme\d+n\d+|sd[a-z]+)$")
+
+# Upper bound on concurrent smartctl processes
+SMART_WORKERS = 4
+
+# SMART counters move slowly; re-probing more often only wakes the drive
+SMART_TTL = 300
 
-def run_smartctl():
+# NVMe data units are 1000 * 512 bytes
+NVME_DATA_UNIT = 512_000
+
+
+def list_devices():
+    try:
+        names = os.listdir(SYS_BLOCK)
+    except Exception as e:
+        instrument.swallowed("ssd.list_devices", e)
+        return [NVME_DEVICE]
+    return sorted(
+        f"/dev/{n}" for n in names
+        if DISK_NAME.match(n) and sysfs.read_int(f"{SYS_BLOCK}/{n}/removable") != 1
+    )
+
+
+def run_smartctl(device=NVME_DEVICE, json_output=True):
     """
-    Runs smartctl for the NVMe device and returns raw output.
+    Runs smartctl for one device and returns raw output.
+
+    Goes through the privileged helper when one is running (one
+    request on an open socket) and falls back to `sudo -n smartctl`,
+    which fails instead of prompting for a password (probes run in
+    parallel, and the GUI has no terminal). smartctl's exit status is
+    a bitmask that is non-zero for failing drives too, so the output
+    is kept whenever there is any; None means smartctl could not run.
     """
     try:
-        return subprocess.check_output(
-            ["sudo", "smartctl", "-a", NVME_DEVICE],
-            text=True
-        )
-    except Exception:
+        return helper.smartctl(device, json_output) or None
+    except helper.HelperUnavailable:
+        pass
+    except helper.HelperError as e:
+        instrument.swallowed("ssd.helper", e)
         return None
 
+    cmd = ["sudo", "-n", "smartctl", "-a", device]
+    if json_output:
+        cmd.insert(3, "--json")
 
-def parse_nvme_smart(output: str):
-    data = {
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True).stdout
+    except Exception as e:
+        instrument.swallowed("ssd.smartctl", e)
+        return None
+    return out or None
+
+
+def empty_smart():
+    return {
+        "model": None,
         "health": "UNKNOWN",
         "wear_percent": None,
         "available_spare": None,
@@ -33,6 +87,116 @@ def parse_nvme_smart(output: str):
         "temperature_c": None
     }
 
+
+def _tb(nbytes):
+    return round(nbytes / (1024 ** 4), 2)
+
+
+# -----------------------------
+# smartctl --json
+# -----------------------------
+# ATA attribute id -> (field, use normalized value as "life left")
+ATA_ATTRIBUTES = {
+    9: ("power_on_hours", False),
+    12: ("power_cycles", False),
+    174: ("unsafe_shutdowns", False),
+    177: ("wear_percent", True),
+    187: ("media_errors", False),
+    192: ("unsafe_shutdowns", False),
+    194: ("temperature_c", False),
+    231: ("wear_percent", True),
+    233: ("wear_percent", True),
+}
+
+
+def parse_smart_json(output: str):
+    """
+    Parse `smartctl --json -a` output (NVMe or ATA). Returns None when
+    the output is not JSON, e.g. from a smartctl without --json.
+
+    A device that reports no SMART data at all (many USB bridges) gets
+    health "UNSUPPORTED" and is left out of scoring.
+    """
+    try:
+        doc = json.loads(output)
+    except (TypeError, ValueError):
+        return None
+
+    data = empty_smart()
+    data["model"] = doc.get("model_name")
+
+    status = doc.get("smart_status")
+    nvme = doc.get("nvme_smart_health_information_log")
+    ata = doc.get("ata_smart_attributes")
+    if status is not None:
+        data["health"] = "PASSED" if status.get("passed") else "FAILED"
+    elif (not nvme and not ata) or doc.get("smart_support", {}).get("available") is False:
+        data["health"] = "UNSUPPORTED"
+    else:
+        data["health"] = "ERROR"
+
+    if nvme:
+        data["wear_percent"] = nvme.get("percentage_used")
+        data["available_spare"] = nvme.get("available_spare")
+        data["spare_threshold"] = nvme.get("available_spare_threshold")
+        data["power_on_hours"] = nvme.get("power_on_hours")
+        data["power_cycles"] = nvme.get("power_cycles")
+        data["unsafe_shutdowns"] = nvme.get("unsafe_shutdowns")
+        data["media_errors"] = nvme.get("media_errors")
+        data["critical_warning"] = nvme.get("critical_warning")
+        data["temperature_c"] = nvme.get("temperature")
+        if nvme.get("data_units_written") is not None:
+            data["data_written_tb"] = _tb(nvme["data_units_written"] * NVME_DATA_UNIT)
+        if nvme.get("data_units_read") is not None:
+            data["data_read_tb"] = _tb(nvme["data_units_read"] * NVME_DATA_UNIT)
+        return data
+
+    block_size = doc.get("logical_block_size", 512)
+    for attr in (ata or {}).get("table", []):
+        if attr.get("id") == 241:
+            data["data_written_tb"] = _tb(attr["raw"]["value"] * block_size)
+        elif attr.get("id") == 242:
+            data["data_read_tb"] = _tb(attr["raw"]["value"] * block_size)
+        elif attr.get("id") in ATA_ATTRIBUTES:
+            field, life_left = ATA_ATTRIBUTES[attr["id"]]
+            if life_left:
+                data[field] = 100 - attr["value"]
+            elif data[field] is None:
+                # Raw temperature packs min/max into the upper bytes
+                data[field] = attr["raw"]["value"] & 0xFF if attr["id"] == 194 else attr["raw"]["value"]
+
+    if data["temperature_c"] is None:
+        data["temperature_c"] = doc.get("temperature", {}).get("current")
+    if data["power_on_hours"] is None:
+        data["power_on_hours"] = doc.get("power_on_time", {}).get("hours")
+
+    return data
+
+
+# -----------------------------
+# smartctl -a (text fallback)
+# -----------------------------
+# "Label:" -> field; the whole output is parsed in a single pass
+NVME_TEXT_FIELDS = {
+    "Percentage Used": "wear_percent",
+    "Available Spare": "available_spare",
+    "Available Spare Threshold": "spare_threshold",
+    "Power On Hours": "power_on_hours",
+    "Power Cycles": "power_cycles",
+    "Unsafe Shutdowns": "unsafe_shutdowns",
+    "Media and Data Integrity Errors": "media_errors",
+    "Critical Warning": "critical_warning",
+    "Temperature": "temperature_c",
+    "Data Units Written": "data_written_tb",
+    "Data Units Read": "data_read_tb",
+}
+
+_NUMBER = re.compile(r"0x[0-9a-fA-F]+|[\d,]+")
+
+
+def parse_nvme_smart(output: str):
+    data = empty_smart()
+
     if not output:
         data["health"] = "ERROR"
         return data
@@ -41,42 +205,58 @@ def parse_nvme_smart(output: str):
         data["health"] = "PASSED"
     elif "FAILED" in output:
         data["health"] = "FAILED"
+    elif "SMART support is: Unavailable" in output:
+        data["health"] = "UNSUPPORTED"
 
-    patterns = {
-        "wear_percent": r"Percentage Used:\s+(\d+)%",
-        "available_spare": r"Available Spare:\s+(\d+)%",
-        "spare_threshold": r"Available Spare Threshold:\s+(\d+)%",
-        "power_on_hours": r"Power On Hours:\s+([\d,]+)",
-        "power_cycles": r"Power Cycles:\s+([\d,]+)",
-        "unsafe_shutdowns": r"Unsafe Shutdowns:\s+([\d,]+)",
-        "media_errors": r"Media and Data Integrity Errors:\s+(\d+)",
-        "critical_warning": r"Critical Warning:\s+0x([0-9a-fA-F]+)",
-        "temperature_c": r"Temperature:\s+(\d+)\s+Celsius"
-    }
+    for line in output.splitlines():
+        label, sep, value = line.partition(":")
+        key = NVME_TEXT_FIELDS.get(label) if sep else None
+        if not key:
+            continue
+
+        m = _NUMBER.search(value)
+        if not m:
+            continue
+        raw = m.group(0)
+        number = int(raw, 16) if raw.startswith("0x") else int(raw.replace(",", ""))
 
-    for key, pattern in patterns.items():
-        m = re.search(pattern, output)
-        if m:
-            data[key] = int(m.group(1).replace(",", ""))
+        if key in ("data_written_tb", "data_read_tb"):
+            data[key] = _tb(number * NVME_DATA_UNIT)
+        else:
+            data[key] = number
 
-    # Data written
-    m = re.search(r"Data Units Written:\s+([\d,]+)", output)
-    if m:
-        units = int(m.group(1).replace(",", ""))
-        data["data_written_tb"] = round((units * 512_000) / (1024 ** 4), 2)
+    return data
 
-    # Data read
-    m = re.search(r"Data Units Read:\s+([\d,]+)", output)
-    if m:
-        units = int(m.group(1).replace(",", ""))
-        data["data_read_tb"] = round((units * 512_000) / (1024 ** 4), 2)
 
+def probe_device(device):
+    """
+    SMART data for one device, or None when smartctl cannot be run
+    (no helper and no passwordless sudo).
+    """
+    output = run_smartctl(device)
+    if output is None:
+        return None
+    data = parse_smart_json(output)
+    if data is None:
+        data = parse_nvme_smart(run_smartctl(device, json_output=False))
     return data
 
 
+@cached(ttl=SMART_TTL)
 def get_ssd_health():
     """
     Public API used by main.py
+
+    Returns {"devices": {"/dev/nvme0n1": {...}, ...}}, probing every
+    disk in parallel with at most SMART_WORKERS smartctl processes.
+    Disks smartctl could not be run for are left out, so they are not
+    scored as failing.
     """
-    raw = run_smartctl()
-    return parse_nvme_smart(raw)
+    devices = list_devices()
+    if not devices:
+        return {"devices": {}}
+
+    with ThreadPoolExecutor(max_workers=min(SMART_WORKERS, len(devices))) as pool:
+        results = pool.map(instrument.bind(probe_device), devices)
+
+    return {"devices": {d: data for d, data in zip(devices, results) if data is not None}}
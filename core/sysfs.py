@@ -0,0 +1,95 @@
+import os
+import threading
+
+INITIAL_BUFFER = 4096
+
+
+class SysfsReader:
+    """
+    Pool of open sysfs/procfs attribute files.
+
+    Each path is opened once and re-read with pread at offset 0 into a
+    reusable per-file buffer, so a refresh costs one syscall per value
+    instead of open/read/close. A file that vanishes (hot-unplug,
+    driver reload) is dropped from the pool and reopened on next use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}
+
+    def _pread(self, path):
+        """
+        Fill the buffer for `path` and return a memoryview of the data,
+        or None. Must be called with self._lock held.
+        """
+        entry = self._files.get(path)
+        try:
+            if entry is None:
+                fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+                entry = self._files[path] = [fd, bytearray(INITIAL_BUFFER)]
+
+            fd, buf = entry
+            while True:
+                n = os.preadv(fd, [buf], 0)
+                if n < len(buf):
+                    return memoryview(buf)[:n]
+                # Attribute larger than the buffer (e.g. /proc/stat on
+                # big machines): grow once and keep the bigger buffer
+                buf = entry[1] = bytearray(len(buf) * 2)
+        except OSError:
+            self._drop(path)
+            return None
+
+    def _drop(self, path):
+        entry = self._files.pop(path, None)
+        if entry:
+            try:
+                os.close(entry[0])
+            except OSError:
+                pass
+
+    def read_bytes(self, path):
+        with self._lock:
+            data = self._pread(path)
+            return bytes(data) if data is not None else None
+
+    def read_str(self, path):
+        with self._lock:
+            data = self._pread(path)
+            return str(data, "utf-8", "replace").strip() if data is not None else None
+
+    def read_int(self, path):
+        with self._lock:
+            data = self._pread(path)
+            if data is None:
+                return None
+            try:
+                return int(data)
+            except ValueError:
+                return None
+
+    def parse(self, path, parse):
+        """
+        Call parse() on the raw contents of `path` without copying them
+        out of the pooled buffer, and return its result (None when the
+        file cannot be read). `parse` must not keep the buffer.
+        """
+        with self._lock:
+            data = self._pread(path)
+            return parse(data) if data is not None else None
+
+    def close(self, path=None):
+        with self._lock:
+            for p in [path] if path else list(self._files):
+                self._drop(p)
+
+
+# Shared by every collector in core/
+_reader = SysfsReader()
+
+read_bytes = _reader.read_bytes
+read_str = _reader.read_str
+read_int = _reader.read_int
+parse = _reader.parse
+close = _reader.close
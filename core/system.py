@@ -1,11 +1,168 @@
+import re
 import subprocess
+import threading
+import time
 
-def failed_services():
+from core import instrument
+
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, message_bus, new_method_call
+    from jeepney.io.blocking import Proxy, open_dbus_connection
+except ImportError:  # optional: fall back to systemctl
+    open_dbus_connection = None
+
+# "SYSTEM", or a D-Bus address such as "unix:path=/tmp/test-bus"
+SYSTEMD_BUS = "SYSTEM"
+
+UNIT_PATH_PREFIX = "/org/freedesktop/systemd1/unit/"
+
+# How long the first caller waits for the initial failed-unit list
+DBUS_READY_TIMEOUT = 1.0
+DBUS_RETRY_DELAY = 30
+
+_ESCAPED = re.compile(r"_([0-9a-f]{2})")
+
+
+def unit_name_from_path(path):
+    """
+    Undo systemd's object-path escaping:
+    /org/freedesktop/systemd1/unit/foo_2eservice -> foo.service
+    """
+    label = path[len(UNIT_PATH_PREFIX):]
+    return _ESCAPED.sub(lambda m: chr(int(m.group(1), 16)), label)
+
+
+class SystemdWatcher:
+    """
+    Failed-unit set kept current from systemd's D-Bus signals.
+
+    After seeding the set with ListUnitsFiltered(["failed"]), the
+    watcher thread applies every ActiveState change carried by unit
+    PropertiesChanged signals, so a refresh is an in-memory lookup.
+    If the bus goes away, `connected` drops and callers fall back to
+    systemctl until the watcher reconnects.
+    """
+
+    def __init__(self, bus=SYSTEMD_BUS):
+        self.bus = bus
+        self.connected = False
+        self.ready = threading.Event()
+        # Bumped whenever the failed set changes
+        self.version = 0
+        self._lock = threading.Lock()
+        self._failed = set()
+        self._thread = None
+
+    def start(self):
+        if open_dbus_connection is None:
+            self.ready.set()
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def failed(self):
+        with self._lock:
+            return sorted(self._failed) if self.connected else None
+
+    def _loop(self):
+        while True:
+            try:
+                self._watch()
+            except Exception as e:
+                instrument.swallowed("system.watcher", e)
+            self.connected = False
+            self.ready.set()
+            time.sleep(DBUS_RETRY_DELAY)
+
+    def _watch(self):
+        manager = DBusAddress(
+            "/org/freedesktop/systemd1",
+            bus_name="org.freedesktop.systemd1",
+            interface="org.freedesktop.systemd1.Manager"
+        )
+        rule = MatchRule(
+            type="signal",
+            interface="org.freedesktop.DBus.Properties",
+            member="PropertiesChanged",
+            path_namespace="/org/freedesktop/systemd1/unit"
+        )
+
+        with open_dbus_connection(bus=self.bus) as conn:
+            # Subscribe before seeding so no transition is missed
+            with conn.filter(rule, bufsize=1024) as queue:
+                Proxy(message_bus, conn).AddMatch(rule)
+                conn.send_and_get_reply(new_method_call(manager, "Subscribe"))
+
+                reply = conn.send_and_get_reply(
+                    new_method_call(manager, "ListUnitsFiltered", "as", (["failed"],))
+                )
+                with self._lock:
+                    self._failed = {unit[0] for unit in reply.body[0]}
+                    self.connected = True
+                    self.version += 1
+                self.ready.set()
+
+                while True:
+                    self._apply(conn.recv_until_filtered(queue))
+
+    def _apply(self, msg):
+        interface, changed, _ = msg.body
+        if interface != "org.freedesktop.systemd1.Unit" or "ActiveState" not in changed:
+            return
+
+        name = unit_name_from_path(msg.header.fields[HeaderFields.path])
+        _, state = changed["ActiveState"]
+
+        with self._lock:
+            before = len(self._failed)
+            if state == "failed":
+                self._failed.add(name)
+            else:
+                self._failed.discard(name)
+            if len(self._failed) != before:
+                self.version += 1
+
+
+_watcher = SystemdWatcher()
+
+
+def _failed_units_systemctl():
     try:
         out = subprocess.check_output(
-            ["systemctl", "--failed", "--no-legend"],
-            text=True
+            ["systemctl", "--failed", "--no-legend", "--plain"],
+            text=True,
+            stderr=subprocess.DEVNULL
         )
-        return len(out.strip().splitlines()) if out.strip() else 0
-    except Exception:
-        return 0
+        return [line.split()[0] for line in out.strip().splitlines() if line.strip()]
+    except Exception as e:
+        instrument.swallowed("system.systemctl", e)
+        return []
+
+
+def failed_units():
+    """
+    Names of failed systemd units, from the D-Bus watcher when it is
+    connected and from `systemctl --failed` otherwise.
+    """
+    _watcher.start()
+    _watcher.ready.wait(DBUS_READY_TIMEOUT)
+
+    units = _watcher.failed()
+    if units is None:
+        return _failed_units_systemctl()
+    return units
+
+
+def failed_units_version():
+    """
+    Token that changes whenever the D-Bus watcher sees the failed set
+    change; None while it is not connected (changes go unnoticed).
+    """
+    return _watcher.version if _watcher.connected else None
+
+
+def failed_services():
+    return len(failed_units())
@@ -1,13 +1,174 @@
-import psutil
+import os
+import re
+import threading
+
+from core import instrument, sysfs
+
+HWMON_PATH = "/sys/class/hwmon"
+
+# hwmon chip name -> sensor labels that identify the CPU package,
+# in order of preference (Intel, then AMD)
+CPU_CHIPS = {
+    "coretemp": ("Package",),
+    "k10temp": ("Tdie", "Tctl"),
+    "zenpower": ("Tdie", "Tctl"),
+}
+
+NVME_CHIPS = {
+    "nvme": ("Composite",),
+}
+
+ACPI_CHIP = "acpitz"
+
+_TEMP_INPUT = re.compile(r"temp(\d+)_input$")
+
+
+def _read_once(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except Exception as e:
+        instrument.swallowed("temps.read", e)
+        return None
+
+
+def _millidegrees(value):
+    try:
+        return int(value) / 1000
+    except (TypeError, ValueError):
+        return None
+
+
+def _chip_sensors(base):
+    """
+    List (label, input_path, high, critical) for every temp*_input of
+    one hwmon directory. Thresholds are read here once and cached.
+    """
+    sensors = []
+    try:
+        files = sorted(os.listdir(base))
+    except Exception as e:
+        instrument.swallowed("temps.chip", e)
+        return sensors
+
+    for name in files:
+        m = _TEMP_INPUT.match(name)
+        if not m:
+            continue
+        prefix = f"{base}/temp{m.group(1)}"
+        sensors.append((
+            _read_once(f"{prefix}_label") or "",
+            f"{prefix}_input",
+            _millidegrees(_read_once(f"{prefix}_max")),
+            _millidegrees(_read_once(f"{prefix}_crit")),
+        ))
+    return sensors
+
+
+def _pick(sensors, labels):
+    for wanted in labels:
+        matches = [s for s in sensors if wanted in s[0]]
+        if matches:
+            return matches
+    # Unlabelled chips (some k10temp versions) expose a single temp1
+    if sensors and not any(s[0] for s in sensors):
+        return sensors[:1]
+    return []
+
+
+class HwmonIndex:
+    """
+    Index of the few hwmon inputs we report.
+
+    The hwmon tree is walked once; later reads only touch the indexed
+    temp*_input files through the sysfs pool. Call rescan() after
+    hotplug; a vanished input also triggers a rescan on the next read.
+    """
+
+    def __init__(self, root=HWMON_PATH):
+        self.root = root
+        self._lock = threading.Lock()
+        self._index = None
+
+    def rescan(self):
+        with self._lock:
+            self._index = None
+
+    def _scan(self):
+        index = {"cpu": [], "nvme": [], "acpi": []}
+
+        try:
+            entries = sorted(os.listdir(self.root))
+        except Exception as e:
+            instrument.swallowed("temps.scan", e)
+            return index
+
+        for entry in entries:
+            base = f"{self.root}/{entry}"
+            chip = _read_once(f"{base}/name")
+
+            if chip in CPU_CHIPS:
+                index["cpu"] += _pick(_chip_sensors(base), CPU_CHIPS[chip])
+            elif chip in NVME_CHIPS:
+                index["nvme"] += _pick(_chip_sensors(base), NVME_CHIPS[chip])
+            elif chip == ACPI_CHIP and not index["acpi"]:
+                index["acpi"] = _chip_sensors(base)[:1]
+
+        return index
+
+    def read(self):
+        """
+        Return the temperatures dict, or None when the tree has no
+        sensor we know about.
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            index = self._index
+
+        if not any(index.values()):
+            return None
+
+        result = {}
+        vanished = False
+
+        for key, sensors in index.items():
+            hottest = None
+            for label, path, high, critical in sensors:
+                current = _millidegrees(sysfs.read_int(path))
+                if current is None:
+                    vanished = True
+                    continue
+                # Multi-socket / multi-drive hosts report the hottest sensor
+                if hottest is None or current > hottest["current"]:
+                    hottest = {"current": current, "high": high, "critical": critical}
+
+            if hottest:
+                result[key] = hottest["current"] if key == "acpi" else hottest
+
+        if vanished:
+            self.rescan()
+
+        return result
+
+
+_hwmon = HwmonIndex()
+rescan = _hwmon.rescan
+
+
+def _from_psutil():
+    """
+    Fallback for hosts without a readable hwmon tree.
+    """
+    import psutil
 
-def get_temperatures():
     temps = psutil.sensors_temperatures()
     result = {}
 
     # CPU temperature
-    if "coretemp" in temps:
-        for t in temps["coretemp"]:
-            if "Package" in t.label:
+    for chip, labels in CPU_CHIPS.items():
+        if chip in temps and "cpu" not in result:
+            for _, t, _, _ in _pick([(t.label, t, None, None) for t in temps[chip]], labels):
                 result["cpu"] = {
                     "current": t.current,
                     "high": t.high,
@@ -29,3 +190,10 @@ def get_temperatures():
         result["acpi"] = temps["acpitz"][0].current
 
     return result
+
+
+def get_temperatures():
+    result = _hwmon.read()
+    if result is None:
+        return _from_psutil()
+    return result
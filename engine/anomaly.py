@@ -0,0 +1,214 @@
+import math
+import threading
+import time
+from collections import deque
+
+from engine.rules import field_reader
+
+# Samples kept in each series' percentile sketch
+WINDOW = 512
+
+# Time constants (seconds) of the baseline and rate-of-change EWMAs
+BASELINE_TAU = 900
+RATE_TAU = 30
+
+# A series says nothing until it has seen this many samples
+WARMUP = 30
+
+# Baseline standard deviations a value must exceed to be abnormal
+Z_SCORE = 4
+
+# While a series is abnormal its baseline learns this much slower, so
+# a sustained excursion is reported for a while before it becomes the
+# new normal
+ANOMALY_LEARN = 0.1
+
+# -----------------------------
+# Series table
+# -----------------------------
+# "lo"/"hi" bound the percentile sketch (1-unit buckets). A value is
+# abnormal for this host when it sits "min_delta" above the baseline
+# mean, Z_SCORE deviations above it and above the sketch's p95, and is
+# at least "floor". "rise" is the rate (units per minute) reported as
+# rising fast. Both flags clear at half their trigger distance.
+SERIES = [
+    {
+        "id": "cpu.temperature", "component": "cpu", "field": "temps.cpu.current",
+        "label": "CPU temperature", "unit": "°C",
+        "lo": 0, "hi": 120, "floor": 55, "min_delta": 15, "rise": 20,
+    },
+    {
+        "id": "ssd.temperature", "component": "ssd", "field": "temps.nvme.current",
+        "label": "SSD temperature", "unit": "°C",
+        "lo": 0, "hi": 100, "floor": 50, "min_delta": 10, "rise": 10,
+    },
+    {
+        "id": "gpu.temperature", "component": "gpu", "field": "gpu.hottest",
+        "label": "GPU temperature", "unit": "°C",
+        "lo": 0, "hi": 120, "floor": 55, "min_delta": 15, "rise": 20,
+    },
+    {
+        "id": "memory.ram", "component": "memory", "field": "memory.ram.percent",
+        "label": "RAM usage", "unit": "%",
+        "lo": 0, "hi": 100, "floor": 60, "min_delta": 20, "rise": 30,
+    },
+]
+
+
+class Sketch:
+    """
+    Percentiles over the last WINDOW samples in fixed 1-unit buckets.
+
+    Adding a sample is O(1) (the oldest one rolls out of its bucket);
+    a percentile walks the fixed bucket array.
+    """
+
+    def __init__(self, lo, hi, window=WINDOW):
+        self.lo = lo
+        self.counts = [0] * (int(hi - lo) + 1)
+        self.recent = deque(maxlen=window)
+
+    def add(self, value):
+        bucket = min(max(int(value - self.lo), 0), len(self.counts) - 1)
+        if len(self.recent) == self.recent.maxlen:
+            self.counts[self.recent[0]] -= 1
+        self.recent.append(bucket)
+        self.counts[bucket] += 1
+
+    def percentile(self, q):
+        """
+        Upper edge of the bucket holding the q-th percentile, or None.
+        """
+        if not self.recent:
+            return None
+        rank = q / 100 * len(self.recent)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.lo + bucket + 1
+        return self.lo + len(self.counts)
+
+
+class SeriesStats:
+    """
+    Streaming statistics and flags for one series.
+
+    Keeps an EWMA mean and variance (the host's baseline), an EWMA of
+    the rate of change and a percentile sketch. Weights come from the
+    time between samples, so irregular refresh cadences do not skew
+    the baseline. Memory and work per sample are constant.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.read = field_reader(spec["field"])
+        self.sketch = Sketch(spec["lo"], spec["hi"])
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.rate = 0.0
+        self.last = None
+        self.last_time = None
+        self.abnormal = False
+        self.rising = False
+
+    def observe(self, value, now):
+        spec = self.spec
+
+        if self.last_time is None:
+            self.mean, self.last, self.last_time = value, value, now
+            self.count = 1
+            self.sketch.add(value)
+            return
+
+        dt = now - self.last_time
+        if dt <= 0:
+            return
+
+        # Judge the sample against the baseline before learning from it
+        if self.count >= WARMUP:
+            std = math.sqrt(self.var)
+            excess = value - self.mean
+            trigger = max(spec["min_delta"], Z_SCORE * std)
+            if self.abnormal:
+                self.abnormal = excess >= trigger / 2
+            else:
+                p95 = self.sketch.percentile(95)
+                self.abnormal = excess >= trigger and value > p95 and value >= spec["floor"]
+
+        slope = (value - self.last) / dt * 60
+        alpha = 1 - math.exp(-dt / RATE_TAU)
+        self.rate += alpha * (slope - self.rate)
+        if self.count >= WARMUP:
+            if self.rising:
+                self.rising = self.rate >= spec["rise"] / 2
+            else:
+                self.rising = self.rate >= spec["rise"] and value >= spec["floor"]
+
+        alpha = 1 - math.exp(-dt / BASELINE_TAU)
+        if self.abnormal:
+            alpha *= ANOMALY_LEARN
+        diff = value - self.mean
+        step = alpha * diff
+        self.mean += step
+        self.var = (1 - alpha) * (self.var + diff * step)
+
+        self.sketch.add(value)
+        self.count += 1
+        self.last, self.last_time = value, now
+
+    def issues(self):
+        spec = self.spec
+        out = []
+        if self.abnormal:
+            out.append(
+                f"{spec['label']} abnormal for this host "
+                f"({self.last:.0f}{spec['unit']}, usually ~{self.mean:.0f}{spec['unit']})"
+            )
+        if self.rising:
+            out.append(f"{spec['label']} rising fast (+{self.rate:.0f}{spec['unit']}/min)")
+        return out
+
+
+class AnomalyDetector:
+    """
+    Per-host anomaly flags for the series in SERIES.
+
+    observe() takes the top-level snapshot keys refreshed this tick, as
+    passed to RuleEngine.update(), and feeds only the series that read
+    them.
+    """
+
+    def __init__(self, series=SERIES, clock=time.monotonic):
+        self.series = [SeriesStats(spec) for spec in series]
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._by_key = {}
+        for stats in self.series:
+            key = stats.spec["field"].split(".", 1)[0]
+            self._by_key.setdefault(key, []).append(stats)
+
+    def observe(self, data, refreshed):
+        """
+        Feed the current value of every series that reads one of the
+        keys in `refreshed`.
+        """
+        now = self.clock()
+        with self._lock:
+            for key in refreshed:
+                for stats in self._by_key.get(key, ()):
+                    value = stats.read(data)
+                    if value is not None:
+                        stats.observe(value, now)
+
+    def issues(self):
+        """
+        [(component, issue)] for every series currently flagged.
+        """
+        with self._lock:
+            return [
+                (stats.spec["component"], issue)
+                for stats in self.series
+                for issue in stats.issues()
+            ]
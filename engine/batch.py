@@ -0,0 +1,215 @@
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional: fall back to the scalar scorer
+    np = None
+
+from engine.rules import _OPS, _Rule, configured_rules
+from engine.score_v2 import COMPONENT_MAX, clamp
+
+# Columns read by score_batch; names match engine.store.FIELDS.
+# NaN means the value was not collected.
+BATCH_FIELDS = (
+    "cpu.usage",
+    "temps.cpu",
+    "temps.nvme",
+    "memory.ram",
+    "memory.swap",
+    "gpu.temperature",
+    "battery.wear",
+    "ssd.passed",
+    "ssd.wear",
+    "services.failed",
+)
+
+
+# Rule fields (and "requires" fields) -> the columns holding them, as
+# snapshot_from_row() builds them; a "requires" field is present when
+# any of its columns is. Rules reading anything else cannot be
+# re-scored from columns and are skipped.
+FIELD_COLUMNS = {
+    "cpu": ("cpu.usage",),
+    "cpu.usage_percent": ("cpu.usage",),
+    "temps.cpu": ("temps.cpu",),
+    "temps.cpu.current": ("temps.cpu",),
+    "temps.nvme": ("temps.nvme",),
+    "temps.nvme.current": ("temps.nvme",),
+    "memory": ("memory.ram", "memory.swap"),
+    "memory.ram.percent": ("memory.ram",),
+    "memory.swap.percent": ("memory.swap",),
+    "gpu.hottest": ("gpu.temperature",),
+    "battery.present": ("battery.wear",),
+    "battery.wear_percent": ("battery.wear",),
+    "ssd": ("ssd.passed",),
+    "ssd.worst.health": ("ssd.passed",),
+    "ssd.worst.wear_percent": ("ssd.wear",),
+    "services.count": ("services.failed",),
+}
+
+
+def batch_rules(rules):
+    """
+    The rules of a table that score_batch can evaluate from columns.
+    """
+    return [
+        spec for spec in rules
+        if all(f in FIELD_COLUMNS for f in [spec["field"]] + spec.get("requires", []))
+    ]
+
+
+def _nan(value):
+    return value is None or math.isnan(value)
+
+
+def snapshot_from_row(row):
+    """
+    Minimal snapshot dict that the scalar scorer treats exactly like
+    one row of columns. Used by the fallback path and for parity checks.
+    """
+    data = {}
+
+    if not _nan(row.get("cpu.usage")):
+        data["cpu"] = {"usage_percent": row["cpu.usage"]}
+
+    temps = {}
+    for sensor in ("cpu", "nvme"):
+        if not _nan(row.get(f"temps.{sensor}")):
+            temps[sensor] = {"current": row[f"temps.{sensor}"]}
+    data["temps"] = temps
+
+    if not _nan(row.get("memory.ram")) or not _nan(row.get("memory.swap")):
+        data["memory"] = {
+            "ram": {"percent": None if _nan(row.get("memory.ram")) else row["memory.ram"]},
+            "swap": {"percent": None if _nan(row.get("memory.swap")) else row["memory.swap"]},
+        }
+
+    if not _nan(row.get("gpu.temperature")):
+        data["gpu"] = {"nvidia": {"temperature": row["gpu.temperature"]}}
+
+    if not _nan(row.get("battery.wear")):
+        data["battery"] = {"present": True, "wear_percent": row["battery.wear"]}
+
+    if not _nan(row.get("ssd.passed")):
+        data["ssd"] = {
+            "health": "PASSED" if row["ssd.passed"] else "FAILED",
+            "wear_percent": None if _nan(row.get("ssd.wear")) else row["ssd.wear"],
+        }
+
+    if not _nan(row.get("services.failed")):
+        data["services"] = int(row["services.failed"])
+
+    return data
+
+
+def _values(spec, col):
+    # SMART health is recorded as 1 (PASSED) / 0; rules compare strings
+    value = col(FIELD_COLUMNS[spec["field"]][0])
+    if spec["field"] == "ssd.worst.health":
+        return np.where(value == 1, "PASSED", "FAILED")
+    return value
+
+
+def _deduction(spec, col, n):
+    """
+    Deduction of one rule for every row: the first level reached
+    applies; rows missing the value or a required field get none.
+    """
+    present = ~np.isnan(col(FIELD_COLUMNS[spec["field"]][0]))
+    for field in spec.get("requires", []):
+        present &= np.logical_or.reduce([~np.isnan(col(c)) for c in FIELD_COLUMNS[field]])
+
+    value = _values(spec, col)
+    op = _OPS[spec.get("op", ">=")]
+    out = np.zeros(n)
+    taken = ~present
+    for level in spec["levels"]:
+        hit = ~taken & op(value, level["threshold"])
+        points = level["deduction"]
+        if spec.get("per_unit") is not None:
+            points = np.minimum(points, value[hit] * spec["per_unit"])
+        out[hit] = points
+        taken |= hit
+    return out
+
+
+def _score_numpy(cols, n, rules):
+    def col(name):
+        if name not in cols:
+            return np.full(n, np.nan)
+        return np.asarray(cols[name], dtype=np.float64)
+
+    deductions = {c: np.zeros(n) for c in COMPONENT_MAX}
+    with np.errstate(invalid="ignore"):
+        for spec in rules:
+            deductions[spec["component"]] += _deduction(spec, col, n)
+
+    # Component scores are clamped to [0, max] before summing
+    total = np.zeros(n)
+    for component, deduction in deductions.items():
+        top = COMPONENT_MAX[component]
+        deductions[component] = np.clip(deduction, 0, top)
+        total += top - deductions[component]
+
+    return np.clip(total, 0, 100), deductions
+
+
+def _score_scalar(cols, n, rules):
+    score = array("d", bytes(8 * n))
+    deductions = {c: array("d", bytes(8 * n)) for c in COMPONENT_MAX}
+    names = [f for f in BATCH_FIELDS if f in cols]
+    compiled = [_Rule(spec) for spec in rules]
+
+    for i in range(n):
+        data = snapshot_from_row({f: cols[f][i] for f in names})
+        row = dict.fromkeys(COMPONENT_MAX, 0)
+        for rule in compiled:
+            # Every row is scored on its own: no hysteresis between rows
+            rule.active = None
+            row[rule.component] += rule.evaluate(data)[0]
+        total = 0
+        for component, top in COMPONENT_MAX.items():
+            deductions[component][i] = clamp(row[component], 0, top)
+            total += top - deductions[component][i]
+        score[i] = clamp(total)
+
+    return score, deductions
+
+
+def score_batch(columns, rules=None):
+    """
+    Score many snapshots at once from columnar data.
+
+    `columns` maps BATCH_FIELDS names to equal-length sequences (NumPy
+    arrays, array('d') or lists; NaN = not collected). `rules` is a
+    rule table (default: the configured one, rules.json included), so
+    stored history can be re-scored after tuning thresholds. Returns
+    (scores, {component: deductions}) with results identical to
+    calculate_health on the equivalent snapshots, for every rule in
+    batch_rules(). Uses NumPy when it is installed and the scalar
+    scorer otherwise.
+    """
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("score_batch columns must have the same length")
+    n = lengths.pop() if lengths else 0
+
+    rules = batch_rules(configured_rules() if rules is None else rules)
+    if np is not None:
+        return _score_numpy(columns, n, rules)
+    return _score_scalar(columns, n, rules)
+
+
+def columns_from_store(store, since=-math.inf, until=math.inf):
+    """
+    Load a time range of a HistoryStore as (times, columns) arrays,
+    ready for score_batch.
+    """
+    times = array("d")
+    cols = {f: array("d") for f in BATCH_FIELDS}
+    for t, row in store.query(since, until, BATCH_FIELDS):
+        times.append(t)
+        for f in BATCH_FIELDS:
+            cols[f].append(row[f])
+    return times, cols
@@ -0,0 +1,189 @@
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from engine.score_v2 import worst_ssd_device
+
+# Raw samples kept per series
+RAW_CAPACITY = 3600
+
+# Rollup resolution in seconds -> number of buckets kept
+# (1 h of seconds, 1 day of minutes, 30 days of hours)
+ROLLUPS = {
+    1: 3600,
+    60: 1440,
+    3600: 720,
+}
+
+
+def extract_series(data, score=None):
+    """
+    Flatten a snapshot into {series_name: float} for every numeric
+    value we chart. Missing sections are simply left out.
+    """
+    out = {}
+
+    cpu = data.get("cpu") or {}
+    if cpu.get("usage_percent") is not None:
+        out["cpu.usage"] = cpu["usage_percent"]
+
+    for sensor, value in (data.get("temps") or {}).items():
+        current = value.get("current") if isinstance(value, dict) else value
+        if current is not None:
+            out[f"temps.{sensor}"] = current
+
+    mem = data.get("memory") or {}
+    if mem.get("ram", {}).get("percent") is not None:
+        out["memory.ram"] = mem["ram"]["percent"]
+    if mem.get("swap", {}).get("percent") is not None:
+        out["memory.swap"] = mem["swap"]["percent"]
+
+    gpu = data.get("gpu") or {}
+    for ng in gpu.get("nvidia_gpus") or ([gpu["nvidia"]] if gpu.get("nvidia") else []):
+        index = ng.get("index", 0)
+        if ng.get("temperature") is not None:
+            out[f"gpu.{index}.temperature"] = ng["temperature"]
+            # Hottest card, as scored by score_gpu
+            out["gpu.temperature"] = max(out.get("gpu.temperature", -math.inf), ng["temperature"])
+        if ng.get("vram_used_mb") is not None:
+            out[f"gpu.{index}.vram_used_mb"] = ng["vram_used_mb"]
+
+    bat = data.get("battery") or {}
+    if bat.get("present") and bat.get("percent") is not None:
+        out["battery.percent"] = bat["percent"]
+    if bat.get("present") and bat.get("wear_percent") is not None:
+        out["battery.wear"] = bat["wear_percent"]
+
+    _, ssd = worst_ssd_device(data.get("ssd"))
+    if ssd:
+        out["ssd.passed"] = 1.0 if ssd.get("health") == "PASSED" else 0.0
+        if ssd.get("wear_percent") is not None:
+            out["ssd.wear"] = ssd["wear_percent"]
+
+    services = data.get("services")
+    if services is not None:
+        out["services.failed"] = len(services) if isinstance(services, (list, tuple)) else services
+
+    if score is not None:
+        out["score"] = score
+
+    return out
+
+
+class RingBuffer:
+    """
+    Fixed-capacity (time, value) ring backed by two array('d').
+
+    Appends overwrite the oldest sample once full, so memory never
+    grows. range() returns contiguous arrays in time order.
+    """
+
+    def __init__(self, capacity, columns=1):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = [array("d", bytes(8 * capacity)) for _ in range(columns)]
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, t, *values):
+        i = (self.start + self.size) % self.capacity
+        self.times[i] = t
+        for column, value in zip(self.columns, values):
+            column[i] = value
+
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def _ordered(self, column):
+        end = self.start + self.size
+        if end <= self.capacity:
+            return column[self.start:end]
+        return column[self.start:] + column[:end - self.capacity]
+
+    def range(self, t0=-math.inf, t1=math.inf):
+        """
+        Return (times, *columns) for samples with t0 <= t <= t1.
+        """
+        times = self._ordered(self.times)
+        lo = bisect_left(times, t0)
+        hi = bisect_right(times, t1)
+        return (times[lo:hi],) + tuple(self._ordered(c)[lo:hi] for c in self.columns)
+
+
+class Series:
+    """
+    One metric: a raw ring plus min/avg/max rollups per resolution.
+    """
+
+    def __init__(self):
+        self.raw = RingBuffer(RAW_CAPACITY)
+        self.rollups = {res: RingBuffer(cap, columns=3) for res, cap in ROLLUPS.items()}
+        # res -> [bucket_start, count, sum, min, max] of the open bucket
+        self._open = {}
+
+    def append(self, t, value):
+        self.raw.append(t, value)
+
+        for res, ring in self.rollups.items():
+            bucket = t - t % res
+            acc = self._open.get(res)
+
+            if acc and acc[0] != bucket:
+                ring.append(acc[0], acc[3], acc[2] / acc[1], acc[4])
+                acc = None
+
+            if acc is None:
+                self._open[res] = [bucket, 1, value, value, value]
+            else:
+                acc[1] += 1
+                acc[2] += value
+                acc[3] = min(acc[3], value)
+                acc[4] = max(acc[4], value)
+
+    def range(self, t0=-math.inf, t1=math.inf, resolution=None):
+        if resolution is None:
+            return self.raw.range(t0, t1)
+        return self.rollups[resolution].range(t0, t1)
+
+
+class MetricHistory:
+    """
+    In-memory history of every numeric series in the snapshots.
+
+    record() is called once per tick; query() returns contiguous
+    arrays ready for charting: (times, values) for raw samples or
+    (times, mins, avgs, maxs) for a rollup resolution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def record(self, data, score=None, t=None):
+        t = time.time() if t is None else t
+        values = extract_series(data, score)
+
+        with self._lock:
+            for name, value in values.items():
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = Series()
+                series.append(t, float(value))
+
+    def names(self):
+        with self._lock:
+            return sorted(self.series)
+
+    def query(self, name, t0=-math.inf, t1=math.inf, resolution=None):
+        with self._lock:
+            series = self.series.get(name)
+            if series is None:
+                return None
+            return series.range(t0, t1, resolution)
@@ -0,0 +1,463 @@
+import copy
+import json
+import os
+import sys
+import threading
+
+from core import instrument
+from engine.score_v2 import COMPONENT_MAX, clamp, top_processes_note, worst_ssd_device
+
+RULES_PATH = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")),
+    "arch-health", "rules.json"
+)
+
+
+# -----------------------------
+# Fields
+# -----------------------------
+def _path(parts):
+    def get(data):
+        value = data
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+    return get
+
+
+def _ssd_worst(data, key, default=None):
+    _, dev = worst_ssd_device(data.get("ssd"))
+    return dev.get(key, default) if dev else None
+
+
+def _gpu_hottest(data):
+    gpu = data.get("gpu") or {}
+    nvidia = gpu.get("nvidia_gpus") or ([gpu["nvidia"]] if gpu.get("nvidia") else [])
+    temps = [g["temperature"] for g in nvidia if g.get("temperature") is not None]
+    return max(temps) if temps else None
+
+
+def _failed_count(data):
+    failed = data.get("services", 0)
+    return len(failed) if isinstance(failed, (list, tuple)) else failed
+
+
+# Derived fields rules can read besides plain dotted paths
+DERIVED_FIELDS = {
+    # A device without a verdict counts as not PASSED
+    "ssd.worst.health": lambda data: _ssd_worst(data, "health", "UNKNOWN"),
+    "ssd.worst.wear_percent": lambda data: _ssd_worst(data, "wear_percent"),
+    "gpu.hottest": _gpu_hottest,
+    "services.count": _failed_count,
+    "processes.cpu_note": lambda data: top_processes_note(data.get("processes"), "cpu"),
+    "processes.memory_note": lambda data: top_processes_note(data.get("processes"), "memory"),
+}
+
+
+def field_reader(field):
+    """
+    Function reading `field` (a derived name or a dotted path) from a
+    snapshot; missing parts read as None.
+    """
+    return DERIVED_FIELDS.get(field) or _path(tuple(field.split(".")))
+
+
+def _ssd_suffix(data):
+    ssd = data.get("ssd") or {}
+    if len(ssd.get("devices", ())) > 1:
+        return f" ({worst_ssd_device(ssd)[0]})"
+    return ""
+
+
+# -----------------------------
+# Rule table
+# -----------------------------
+# Each rule reads one field and deducts points from one component.
+# "levels" are tried in order and the first one reached applies;
+# "requires" lists fields that must be present for the rule to run.
+# With "per_unit", the deduction is value * per_unit (capped at
+# "deduction"). Issue messages may use {value} and {ssd_suffix};
+# "attach" names a field whose text is appended to the issue.
+# "hysteresis" keeps a level that has fired active until the value
+# falls that far back past its threshold, so readings hovering around
+# a threshold do not flap.
+RULES = [
+    {
+        "id": "cpu.temperature", "component": "cpu",
+        "field": "temps.cpu.current", "requires": ["cpu", "temps.cpu"], "hysteresis": 3,
+        "levels": [
+            {"threshold": 90, "deduction": 15, "issue": "CPU overheating ({value}°C)"},
+            {"threshold": 80, "deduction": 8, "issue": "CPU temperature high ({value}°C)"},
+        ],
+    },
+    {
+        "id": "cpu.usage", "component": "cpu",
+        "field": "cpu.usage_percent", "requires": ["cpu", "temps.cpu"], "op": ">",
+        "attach": "processes.cpu_note", "hysteresis": 5,
+        "levels": [
+            {"threshold": 90, "deduction": 5, "issue": "High CPU usage"},
+        ],
+    },
+    {
+        "id": "ssd.health", "component": "ssd",
+        "field": "ssd.worst.health", "requires": ["ssd"], "op": "!=",
+        "levels": [
+            {"threshold": "PASSED", "deduction": 15, "issue": "SSD SMART health check failed{ssd_suffix}"},
+        ],
+    },
+    {
+        "id": "ssd.wear", "component": "ssd",
+        "field": "ssd.worst.wear_percent", "requires": ["ssd"],
+        "levels": [
+            {"threshold": 80, "deduction": 10, "issue": "SSD near end of life{ssd_suffix}"},
+            {"threshold": 50, "deduction": 5, "issue": "SSD wear increasing{ssd_suffix}"},
+        ],
+    },
+    {
+        "id": "ssd.temperature", "component": "ssd",
+        "field": "temps.nvme.current", "requires": ["ssd"], "hysteresis": 3,
+        "levels": [
+            {"threshold": 80, "deduction": 10, "issue": "SSD overheating ({value}°C)"},
+            {"threshold": 70, "deduction": 5, "issue": "SSD temperature high ({value}°C)"},
+        ],
+    },
+    {
+        "id": "memory.ram", "component": "memory",
+        "field": "memory.ram.percent", "requires": ["memory"],
+        "attach": "processes.memory_note", "hysteresis": 3,
+        "levels": [
+            {"threshold": 95, "deduction": 10, "issue": "RAM critically high usage"},
+            {"threshold": 85, "deduction": 5, "issue": "RAM usage high"},
+        ],
+    },
+    {
+        "id": "memory.swap", "component": "memory",
+        "field": "memory.swap.percent", "requires": ["memory"], "hysteresis": 3,
+        "levels": [
+            {"threshold": 80, "deduction": 5, "issue": "Swap heavily used"},
+        ],
+    },
+    {
+        "id": "battery.wear", "component": "battery",
+        "field": "battery.wear_percent", "requires": ["battery.present"],
+        "levels": [
+            {"threshold": 40, "deduction": 10, "issue": "Battery heavily worn"},
+            {"threshold": 25, "deduction": 5, "issue": "Battery wear noticeable"},
+        ],
+    },
+    {
+        "id": "gpu.temperature", "component": "gpu",
+        "field": "gpu.hottest", "hysteresis": 3,
+        "levels": [
+            {"threshold": 85, "deduction": 7, "issue": "NVIDIA GPU overheating"},
+            {"threshold": 75, "deduction": 3, "issue": "NVIDIA GPU temperature high"},
+        ],
+    },
+    {
+        "id": "services.failed", "component": "services",
+        "field": "services.count", "op": ">", "per_unit": 2,
+        "levels": [
+            {"threshold": 0, "deduction": 10, "issue": "Failed system services ({value})"},
+        ],
+    },
+]
+
+_OPS = {
+    ">=": lambda v, t: v >= t,
+    ">": lambda v, t: v > t,
+    "<=": lambda v, t: v <= t,
+    "<": lambda v, t: v < t,
+    "!=": lambda v, t: v != t,
+    "==": lambda v, t: v == t,
+}
+
+
+def load_rules(path=RULES_PATH, rules=RULES):
+    """
+    Return the rule table with overrides from a JSON config applied.
+
+    The config maps rule ids to fields to replace, e.g.
+        {"cpu.temperature": {"thresholds": [95, 85]},
+         "memory.swap": {"levels": [{"threshold": 90, "deduction": 3,
+                                     "issue": "Swap heavily used"}]}}
+    "thresholds" keeps each level's deduction and message. Unknown ids
+    with a full definition ("component", "field", "levels") add rules.
+    A missing config file leaves the defaults untouched; one that cannot
+    be read or yields an invalid rule is reported on stderr and ignored.
+    """
+    table = copy.deepcopy(rules)
+
+    try:
+        with open(path) as f:
+            overrides = json.load(f)
+        _apply_overrides(table, overrides)
+        for rule in table:
+            _check_rule(rule)
+    except FileNotFoundError:
+        return copy.deepcopy(rules)
+    except (OSError, ValueError) as e:
+        print(f"arch-health: ignoring {path}: {e}", file=sys.stderr)
+        return copy.deepcopy(rules)
+
+    return table
+
+
+def _apply_overrides(table, overrides):
+    if not isinstance(overrides, dict):
+        raise ValueError("expected an object of rule ids")
+
+    by_id = {rule["id"]: rule for rule in table}
+    for rule_id, override in overrides.items():
+        if not isinstance(override, dict):
+            raise ValueError(f"rule {rule_id!r}: expected an object")
+        rule = by_id.get(rule_id)
+        if rule is None:
+            table.append({"id": rule_id, **override})
+            continue
+
+        override = dict(override)
+        thresholds = override.pop("thresholds", None)
+        if thresholds is not None:
+            if not isinstance(thresholds, list):
+                raise ValueError(f"rule {rule_id!r}: \"thresholds\" must be a list")
+            for level, threshold in zip(rule["levels"], thresholds):
+                level["threshold"] = threshold
+        rule.update(override)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_rule(rule):
+    """
+    Raise ValueError unless `rule` can be compiled and evaluated.
+    """
+    def need(ok, problem):
+        if not ok:
+            raise ValueError(f"rule {rule['id']!r}: {problem}")
+
+    op = rule.get("op", ">=")
+    need(rule.get("component") in COMPONENT_MAX, f"unknown component {rule.get('component')!r}")
+    need(isinstance(rule.get("field"), str), "\"field\" must be a string")
+    need(op in _OPS, f"unknown op {op!r}")
+    requires = rule.get("requires", [])
+    need(isinstance(requires, list) and all(isinstance(f, str) for f in requires),
+         "\"requires\" must be a list of fields")
+    need(rule.get("attach") is None or isinstance(rule["attach"], str), "\"attach\" must be a field")
+    need(_is_number(rule.get("hysteresis", 0)), "\"hysteresis\" must be a number")
+    need(rule.get("per_unit") is None or _is_number(rule["per_unit"]), "\"per_unit\" must be a number")
+
+    levels = rule.get("levels")
+    need(isinstance(levels, list) and levels, "\"levels\" must be a non-empty list")
+    for level in levels:
+        need(isinstance(level, dict), "each level must be an object")
+        threshold = level.get("threshold")
+        # Ordering ops compare numbers; == and != may match any value
+        need(_is_number(threshold) or (op in ("==", "!=") and threshold is not None),
+             f"bad threshold {threshold!r}")
+        need(_is_number(level.get("deduction")), "\"deduction\" must be a number")
+        issue = level.get("issue")
+        need(issue is None or isinstance(issue, str), "\"issue\" must be a string")
+        if issue:
+            try:
+                issue.format(value=0, ssd_suffix="")
+            except (IndexError, KeyError, ValueError) as e:
+                need(False, f"bad issue message {issue!r} ({e!r})")
+
+
+# -----------------------------
+# Evaluator
+# -----------------------------
+class _Rule:
+    def __init__(self, spec):
+        self.id = spec["id"]
+        self.component = spec["component"]
+        self.field = spec["field"]
+        self.requires = spec.get("requires", [])
+        self.attach = spec.get("attach")
+        self._read = field_reader(self.field)
+        self._required = [field_reader(f) for f in self.requires]
+        self._attach = field_reader(self.attach) if self.attach else None
+        op = spec.get("op", ">=")
+        self.op = _OPS[op]
+        self.per_unit = spec.get("per_unit")
+        self.levels = spec["levels"]
+        # Signed offset applied to the thresholds of an active level
+        band = spec.get("hysteresis", 0)
+        self.relax = -band if op in (">=", ">") else band if op in ("<=", "<") else 0
+        self.active = None
+        # Top-level snapshot keys this rule reads
+        fields = [self.field] + self.requires + ([self.attach] if self.attach else [])
+        self.deps = {f.split(".", 1)[0] for f in fields}
+
+    def evaluate(self, data):
+        """
+        (deduction, issue or None) for one snapshot. Remembers which
+        level fired, for hysteresis on the next call.
+        """
+        active, self.active = self.active, None
+        for required in self._required:
+            if not required(data):
+                return 0, None
+
+        value = self._read(data)
+        if value is None:
+            return 0, None
+
+        for i, level in enumerate(self.levels):
+            threshold = level["threshold"]
+            # The level that fired last time, and the milder ones below it
+            if self.relax and active is not None and i >= active:
+                threshold += self.relax
+            if self.op(value, threshold):
+                self.active = i
+                deduction = level["deduction"]
+                if self.per_unit is not None:
+                    deduction = min(deduction, value * self.per_unit)
+                issue = level.get("issue")
+                if issue:
+                    issue = issue.format(value=value, ssd_suffix=_ssd_suffix(data))
+                    if self._attach:
+                        issue += self._attach(data) or ""
+                return deduction, issue
+
+        return 0, None
+
+
+class RuleEngine:
+    """
+    Health scoring compiled from a declarative rule table.
+
+    The engine remembers the last snapshot and the result of every
+    rule. update() with a partial snapshot (only the keys refreshed
+    this tick) re-runs just the rules that read those keys and patches
+    the cached component scores and total.
+
+    An optional engine.anomaly.AnomalyDetector is fed every refreshed
+    key on each update; its issues are listed without deducting points.
+    """
+
+    def __init__(self, rules=RULES, caps=COMPONENT_MAX, anomalies=None):
+        self.rules = [_Rule(spec) for spec in rules]
+        self.caps = dict(caps)
+        self.anomalies = anomalies
+        self._by_key = {}
+        for i, rule in enumerate(self.rules):
+            for key in rule.deps:
+                self._by_key.setdefault(key, []).append(i)
+
+        self._lock = threading.RLock()
+        self._state = {}
+        self._results = [(0, None)] * len(self.rules)
+        self._deductions = {c: 0 for c in self.caps}
+        self._scores = dict(self.caps)
+        self._total = sum(self.caps.values())
+
+    def update(self, partial):
+        """
+        Merge a (possibly partial) snapshot and re-evaluate only the
+        rules whose inputs changed. Returns (score, issues).
+        """
+        with self._lock:
+            changed = [k for k, v in partial.items() if k not in self._state or self._state[k] != v]
+            self._state.update(partial)
+            # A steady reading is still a sample for the statistics
+            if self.anomalies is not None:
+                self.anomalies.observe(self._state, partial)
+
+            dirty = sorted({i for k in changed for i in self._by_key.get(k, ())})
+            touched = set()
+            for i in dirty:
+                rule = self.rules[i]
+                old = self._results[i][0]
+                self._results[i] = rule.evaluate(self._state)
+                self._deductions[rule.component] += self._results[i][0] - old
+                touched.add(rule.component)
+
+            for component in touched:
+                cap = self.caps.get(component, 0)
+                new = clamp(cap - self._deductions[component], 0, cap)
+                self._total += new - self._scores.get(component, cap)
+                self._scores[component] = new
+
+            return self._result()
+
+    def evaluate(self, data):
+        """
+        Score a complete snapshot. Keys absent from `data` are treated
+        as absent, not as unchanged.
+        """
+        with self._lock:
+            stale = {k: None for k in self._state if k not in data}
+            return self.update({**stale, **data})
+
+    def _result(self):
+        issues = [issue for _, issue in self._results if issue]
+        if self.anomalies is not None:
+            issues += [issue for _, issue in self.anomalies.issues()]
+        return clamp(self._total), issues
+
+    def components(self, data=None):
+        """
+        {component: (score, issues)}, like score_v2.score_components;
+        evaluates `data` first when given.
+        """
+        with self._lock:
+            if data is not None:
+                self.evaluate(data)
+            out = {c: (self._scores[c], []) for c in self.caps}
+            for rule, (_, issue) in zip(self.rules, self._results):
+                if issue:
+                    out[rule.component][1].append(issue)
+            if self.anomalies is not None:
+                for component, issue in self.anomalies.issues():
+                    if component in out:
+                        out[component][1].append(issue)
+            return out
+
+
+_rules = None
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def configured_rules():
+    """
+    RULES with the user's rules.json applied, loaded once per process.
+    """
+    global _rules
+    with _engine_lock:
+        if _rules is None:
+            _rules = load_rules()
+        return _rules
+
+
+def default_engine():
+    """
+    Shared engine for long-running loops (daemon, watch): keeps
+    hysteresis and anomaly state from one snapshot to the next.
+    """
+    from engine.anomaly import AnomalyDetector
+
+    global _engine
+    rules = configured_rules()
+    with _engine_lock:
+        if _engine is None:
+            _engine = RuleEngine(rules, anomalies=AnomalyDetector())
+        return _engine
+
+
+def calculate_health(data, engine=None):
+    """
+    Drop-in for score_v2.calculate_health backed by the rule engine.
+
+    Each call is scored on its own, like score_v2; long-running callers
+    pass their `engine` (e.g. default_engine()) to keep its state.
+    """
+    with instrument.stage("calculate_health"):
+        if engine is None:
+            engine = RuleEngine(configured_rules())
+        return engine.evaluate(data)
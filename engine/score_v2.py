@@ -2,7 +2,30 @@ def clamp(val, min_v=0, max_v=100):
     return max(min_v, min(val, max_v))
 
 
-def score_cpu(cpu, temps):
+def top_processes_note(processes, kind, limit=3):
+    """
+    " (top: firefox 82%, code 40%)" naming the heaviest processes for
+    an issue of `kind` ("cpu" or "memory"); "" without process data.
+    """
+    if not processes:
+        return ""
+
+    if kind == "cpu":
+        top = [
+            f"{p['name']} {p['cpu_percent']:g}%"
+            for p in processes.get("top_cpu", [])[:limit] if p["cpu_percent"]
+        ]
+    else:
+        top = [
+            f"{p['name']} {p['rss_mb'] / 1024:.1f} GB" if p["rss_mb"] >= 1024
+            else f"{p['name']} {p['rss_mb']:g} MB"
+            for p in processes.get("top_memory", [])[:limit]
+        ]
+
+    return f" (top: {', '.join(top)})" if top else ""
+
+
+def score_cpu(cpu, temps, processes=None):
     score = 25
     issues = []
 
@@ -21,31 +44,65 @@ def score_cpu(cpu, temps):
     usage = cpu.get("usage_percent")
     if usage is not None and usage > 90:
         score -= 5
-        issues.append("High CPU usage")
+        issues.append("High CPU usage" + top_processes_note(processes, "cpu"))
 
     return clamp(score, 0, 25), issues
 
 
-def score_ssd(ssd, temps):
-    score = 25
+def ssd_device_deduction(dev):
+    deduction = 0
     issues = []
 
-    if not ssd:
-        return score, issues
-
-    if ssd["health"] != "PASSED":
-        score -= 15
+    if dev.get("health") != "PASSED":
+        deduction += 15
         issues.append("SSD SMART health check failed")
 
-    wear = ssd.get("wear_percent")
+    wear = dev.get("wear_percent")
     if wear is not None:
         if wear >= 80:
-            score -= 10
+            deduction += 10
             issues.append("SSD near end of life")
         elif wear >= 50:
-            score -= 5
+            deduction += 5
             issues.append("SSD wear increasing")
 
+    return deduction, issues
+
+
+def worst_ssd_device(ssd):
+    """
+    Return (name, data) of the device with the largest deduction, or
+    (None, None). Accepts both the per-device map and a single flat
+    SMART dict. Devices without SMART support are never scored.
+    """
+    if not ssd:
+        return None, None
+
+    devices = ssd["devices"] if "devices" in ssd else {"": ssd}
+    devices = {n: d for n, d in devices.items() if d.get("health") != "UNSUPPORTED"}
+    if not devices:
+        return None, None
+
+    name = max(devices, key=lambda d: ssd_device_deduction(devices[d])[0])
+    return name, devices[name]
+
+
+def score_ssd(ssd, temps):
+    score = 25
+    issues = []
+
+    if not ssd:
+        return score, issues
+
+    # Multi-disk hosts are scored by their worst device
+    name, dev = worst_ssd_device(ssd)
+    if dev is not None:
+        deduction, dev_issues = ssd_device_deduction(dev)
+        score -= deduction
+        if len(ssd.get("devices", ())) > 1:
+            dev_issues = [f"{issue} ({name})" for issue in dev_issues]
+        issues.extend(dev_issues)
+
     if temps and "nvme" in temps:
         nvme_temp = temps["nvme"]["current"]
         if nvme_temp >= 80:
@@ -58,7 +115,7 @@ def score_ssd(ssd, temps):
     return clamp(score, 0, 25), issues
 
 
-def score_memory(mem):
+def score_memory(mem, processes=None):
     score = 15
     issues = []
 
@@ -74,10 +131,10 @@ def score_memory(mem):
     if ram_percent is not None:
         if ram_percent >= 95:
             score -= 10
-            issues.append("RAM critically high usage")
+            issues.append("RAM critically high usage" + top_processes_note(processes, "memory"))
         elif ram_percent >= 85:
             score -= 5
-            issues.append("RAM usage high")
+            issues.append("RAM usage high" + top_processes_note(processes, "memory"))
 
     if swap_percent is not None and swap_percent >= 80:
         score -= 5
@@ -112,11 +169,13 @@ def score_gpu(gpu):
     if not gpu:
         return score, issues
 
-    nvidia = gpu.get("nvidia")
-    if not nvidia:
+    nvidia = gpu.get("nvidia_gpus") or ([gpu["nvidia"]] if gpu.get("nvidia") else [])
+    temps = [g["temperature"] for g in nvidia if g.get("temperature") is not None]
+    if not temps:
         return score, issues  # Optimus inactive is OK
 
-    temp = nvidia["temperature"]
+    # Multi-GPU hosts are scored by their hottest card
+    temp = max(temps)
     if temp >= 85:
         score -= 7
         issues.append("NVIDIA GPU overheating")
@@ -131,25 +190,47 @@ def score_services(failed):
     score = 10
     issues = []
 
-    if failed > 0:
+    # Either a count or the list of failed unit names
+    if isinstance(failed, (list, tuple)):
+        failed = len(failed)
+
+    if failed and failed > 0:
         score -= min(10, failed * 2)
-        issues.append(f"{failed} failed system services")
+        issues.append(f"Failed system services ({failed})")
 
     return clamp(score, 0, 10), issues
 
 
+# Maximum score of each component; they add up to 100
+COMPONENT_MAX = {
+    "cpu": 25,
+    "ssd": 25,
+    "memory": 15,
+    "battery": 15,
+    "gpu": 10,
+    "services": 10,
+}
+
+
+def score_components(data):
+    """
+    {component: (score, issues)} for every scored component.
+    """
+    return {
+        "cpu": score_cpu(data.get("cpu"), data.get("temps"), data.get("processes")),
+        "ssd": score_ssd(data.get("ssd"), data.get("temps")),
+        "memory": score_memory(data.get("memory"), data.get("processes")),
+        "battery": score_battery(data.get("battery")),
+        "gpu": score_gpu(data.get("gpu")),
+        "services": score_services(data.get("services", 0)),
+    }
+
+
 def calculate_health(data):
     total = 0
     issues = []
 
-    for s, i in [
-        score_cpu(data.get("cpu"), data.get("temps")),
-        score_ssd(data.get("ssd"), data.get("temps")),
-        score_memory(data.get("memory")),
-        score_battery(data.get("battery")),
-        score_gpu(data.get("gpu")),
-        score_services(data.get("services", 0)),
-    ]:
+    for s, i in score_components(data).values():
         total += s
         issues.extend(i)
 
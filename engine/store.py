@@ -0,0 +1,275 @@
+import contextlib
+import fcntl
+import math
+import mmap
+import os
+import pwd
+import shutil
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from engine.history import extract_series
+
+
+
+def _sudo_user():
+    """
+    Password entry of the user who ran us through sudo, or None.
+    """
+    name = os.environ.get("SUDO_USER")
+    if not name or os.geteuid() != 0:
+        return None
+    try:
+        return pwd.getpwnam(name)
+    except KeyError:
+        return None
+
+
+def _store_dir():
+    # `sudo arch-health daemon --record` records into the invoking
+    # user's store, the one their own `history` reads
+    user = _sudo_user()
+    if user:
+        base = os.path.join(user.pw_dir, ".local", "share")
+    else:
+        base = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+    return os.path.join(base, "arch-health", "history")
+
+
+STORE_DIR = _store_dir()
+
+# One segment directory per day of samples
+SEGMENT_SECONDS = 86400
+
+RETENTION_DAYS = 30
+
+# Fixed columns; every row has one float64 per field (NaN = missing)
+FIELDS = (
+    "cpu.usage",
+    "temps.cpu",
+    "temps.nvme",
+    "temps.acpi",
+    "memory.ram",
+    "memory.swap",
+    "gpu.temperature",
+    "battery.percent",
+    "battery.wear",
+    "ssd.passed",
+    "ssd.wear",
+    "services.failed",
+    "score",
+)
+
+TIME_COLUMN = "t"
+
+# Taken by writers around recovery and every row, so several processes
+# (a root daemon and the user's own --record) can share one store
+LOCK_FILE = "lock"
+
+_ROW = struct.Struct("d")
+
+
+def _segment_name(start):
+    return f"seg-{int(start)}"
+
+
+def _segment_start(name):
+    try:
+        return int(name[len("seg-"):]) if name.startswith("seg-") else None
+    except ValueError:
+        return None
+
+
+class HistoryStore:
+    """
+    Append-only, columnar time-series store for snapshots.
+
+    Each segment is a directory with one fixed-width float64 file per
+    column. The time column is written last, so its length is the
+    commit point: on open, every column of a torn tail row is cut back
+    to the last complete row. Writers hold an flock on the segment's
+    LOCK_FILE while recovering and while writing each row, so rows from
+    several processes never interleave. Reads memory-map the column
+    files and bisect the time column, so a query never loads whole
+    files.
+
+    Under sudo, everything the store creates is handed to the invoking
+    user, so their own unprivileged --record can keep appending.
+    """
+
+    def __init__(self, path=STORE_DIR, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.owner = _sudo_user()
+        self.retention = retention_days * 86400
+        self._lock = threading.Lock()
+        self._segment = None
+        self._files = {}
+        self._flock = None
+
+    # -----------------------------
+    # Segments
+    # -----------------------------
+    def segments(self):
+        """
+        Sorted (start, directory) for every segment on disk.
+        """
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+
+        out = []
+        for name in names:
+            start = _segment_start(name)
+            if start is not None:
+                out.append((start, os.path.join(self.path, name)))
+        return sorted(out)
+
+    def prune(self, now=None):
+        """
+        Delete segments that ended before the retention window.
+        """
+        cutoff = (time.time() if now is None else now) - self.retention
+        for start, directory in self.segments():
+            if start + SEGMENT_SECONDS < cutoff and start != self._segment:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    @staticmethod
+    def recover(directory):
+        """
+        Truncate every column to the last complete row and create
+        columns added to FIELDS since the segment was started.
+        Returns the number of rows.
+        """
+        def size(column):
+            try:
+                return os.path.getsize(os.path.join(directory, column))
+            except FileNotFoundError:
+                return None
+
+        t_size = size(TIME_COLUMN) or 0
+        rows = min([t_size] + [s for s in map(size, FIELDS) if s is not None]) // _ROW.size
+
+        for column in (TIME_COLUMN,) + FIELDS:
+            path = os.path.join(directory, column)
+            if size(column) is None:
+                # Column added later: pad existing rows with NaN
+                with open(path, "wb") as f:
+                    f.write(_ROW.pack(math.nan) * rows)
+            else:
+                os.truncate(path, rows * _ROW.size)
+
+        return rows
+
+    # -----------------------------
+    # Writing
+    # -----------------------------
+    def _open_segment(self, t):
+        start = int(t - t % SEGMENT_SECONDS)
+        if start == self._segment:
+            return
+
+        self.close()
+
+        directory = os.path.join(self.path, _segment_name(start))
+        created = []
+        parent = directory
+        while not os.path.exists(parent):
+            created.append(parent)
+            parent = os.path.dirname(parent)
+        os.makedirs(directory, exist_ok=True)
+
+        self._flock = open(os.path.join(directory, LOCK_FILE), "ab")
+        with self._locked():
+            self.recover(directory)
+            self._files = {
+                column: open(os.path.join(directory, column), "ab", buffering=0)
+                for column in FIELDS + (TIME_COLUMN,)
+            }
+        if self.owner:
+            for path in created + [self._flock.name] + [f.name for f in self._files.values()]:
+                os.chown(path, self.owner.pw_uid, self.owner.pw_gid)
+        self._segment = start
+        self.prune(t)
+
+    def append(self, data, score=None, t=None):
+        t = time.time() if t is None else t
+        values = extract_series(data, score)
+
+        with self._lock:
+            self._open_segment(t)
+            with self._locked():
+                for field in FIELDS:
+                    self._files[field].write(_ROW.pack(float(values.get(field, math.nan))))
+                # Commit point: the row exists once its timestamp is written
+                self._files[TIME_COLUMN].write(_ROW.pack(t))
+
+    @contextlib.contextmanager
+    def _locked(self):
+        fcntl.flock(self._flock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._flock, fcntl.LOCK_UN)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        if self._flock is not None:
+            self._flock.close()
+        self._files = {}
+        self._flock = None
+        self._segment = None
+
+    # -----------------------------
+    # Reading
+    # -----------------------------
+    def query(self, since=-math.inf, until=math.inf, fields=FIELDS):
+        """
+        Yield (t, {field: value}) for since <= t <= until, in time
+        order, reading through read-only memory maps.
+        """
+        for start, directory in self.segments():
+            if start + SEGMENT_SECONDS < since or start > until:
+                continue
+            yield from self._query_segment(directory, since, until, fields)
+
+    @staticmethod
+    def _map(path):
+        try:
+            with open(path, "rb") as f:
+                # Whole rows only: a segment left with a torn tail (only
+                # the one being written is recovered) still reads
+                size = os.fstat(f.fileno()).st_size // _ROW.size * _ROW.size
+                m = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        except FileNotFoundError:
+            return None, None
+        if m is None:
+            # Empty column
+            return None, None
+        return m, memoryview(m).cast("d")
+
+    def _query_segment(self, directory, since, until, fields):
+        t_map, times = self._map(os.path.join(directory, TIME_COLUMN))
+        if times is None:
+            return
+
+        maps = {field: self._map(os.path.join(directory, field)) for field in fields}
+        try:
+            # A torn tail (crash mid-row) is never read past
+            rows = min([len(times)] + [len(c) for _, c in maps.values() if c is not None])
+            lo = bisect_left(times, since, 0, rows)
+            hi = bisect_right(times, until, lo, rows)
+
+            for i in range(lo, hi):
+                yield times[i], {
+                    field: column[i] if column is not None and i < len(column) else math.nan
+                    for field, (_, column) in maps.items()
+                }
+        finally:
+            for m, column in list(maps.values()) + [(t_map, times)]:
+                if column is not None:
+                    column.release()
+                    m.close()
@@ -1,29 +1,103 @@
-from core.cpu import get_cpu
-from core.memory import get_memory
-from core.temps import get_temperatures
-from core.ssd import get_ssd_health
-from core.battery import get_battery_health
-from core.gpu import get_gpu_health
-from core.system import failed_services
-
-from engine.score_v2 import calculate_health
-from ui.dashboard import render_dashboard
-
-
-def main():
-    data = {
-        "cpu": get_cpu(),
-        "memory": get_memory(),
-        "temps": get_temperatures(),
-        "ssd": get_ssd_health(),
-        "battery": get_battery_health(),
-        "gpu": get_gpu_health(),
-        "services": failed_services(),
-    }
-
-    score, issues = calculate_health(data)
+from core.publish import current_snapshot
+from core.scheduler import ticks
+
+# rich (ui.dashboard) and the collectors are imported where they are
+# used, so one-shot runs only load what they need.
+
+
+def main(names=None, as_json=False):
+    data, score, issues = current_snapshot(names=names)
+
+    if as_json:
+        import json
+        print(json.dumps({"score": score, "issues": issues, "data": data}, indent=2))
+        return
+
+    from ui.dashboard import render_dashboard
     render_dashboard(data, score, issues)
 
 
+def fixed_snapshots(interval, names=None):
+    """
+    (data, score, issues) every `interval` seconds, all collectors at once.
+    """
+    from engine.rules import default_engine
+
+    engine = default_engine()
+    for _ in ticks(interval):
+        yield current_snapshot(names=names, engine=engine)
+
+
+def adaptive_snapshots(names=None):
+    """
+    (data, score, issues) on the adaptive schedule: every wake-up only
+    refreshes the collectors that are due. data["monitor"] reports the
+    current backoff and this process's own CPU usage.
+    """
+    from core.publish import LiveSnapshot
+    from core.scheduler import AdaptiveScheduler
+
+    scheduler = AdaptiveScheduler(names)
+    live = LiveSnapshot(names)
+
+    for due in scheduler:
+        data, score, issues = live.refresh(due)
+        scheduler.observe(data)
+        data["monitor"] = scheduler.status()
+        yield data, score, issues
+
+
+def watch(interval=None, record=False, names=None):
+    """
+    Live dashboard; a fixed `interval` refreshes everything at once,
+    otherwise each collector runs at its own cadence.
+    """
+    from ui.dashboard import LiveDashboard
+
+    if interval:
+        snapshots = fixed_snapshots(interval, names)
+    else:
+        snapshots = adaptive_snapshots(names)
+
+    store = None
+    if record:
+        from engine.store import HistoryStore
+        store = HistoryStore()
+
+    with LiveDashboard() as dashboard:
+        for data, score, issues in snapshots:
+            if store:
+                store.append(data, score)
+            dashboard.update(data, score, issues)
+
+
+def daemon(interval, record=False):
+    """
+    Collect on a fixed schedule and publish every snapshot to shared
+    memory, where main(), watch() and the GUI pick it up instead of
+    running the collectors themselves.
+    """
+    from core.collect import collect
+    from core.publish import SnapshotPublisher
+    from engine.rules import calculate_health, default_engine
+
+    store = None
+    if record:
+        from engine.store import HistoryStore
+        store = HistoryStore()
+
+    engine = default_engine()
+    publisher = SnapshotPublisher(interval=interval)
+    try:
+        for _ in ticks(interval):
+            data = collect()
+            score, issues = calculate_health(data, engine)
+            publisher.publish(data, score, issues)
+            if store:
+                store.append(data, score)
+    finally:
+        publisher.close()
+
+
 if __name__ == "__main__":
     main()
@@ -1,92 +1,196 @@
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
+from rich.text import Text
+
+from core import instrument
 
 console = Console()
 
-def render_dashboard(data, score, issues):
-    table = Table(title="🩺 Arch System Health Monitor", show_lines=True)
 
-    table.add_column("Component", style="bold")
-    table.add_column("Details")
+def dashboard_rows(data):
+    """
+    (component, details) pairs shown in the dashboard table.
+    Sections missing from `data` (not selected with --only) are skipped.
+    Details are plain text: process and unit names are chosen by
+    whoever runs them, so nothing here is parsed as rich markup.
+    """
+    rows = []
 
     # ── CPU ─────────────────────────────
-    cpu = data["cpu"]
-    table.add_row(
-        "CPU",
-        f"Usage: {cpu.get('usage_percent', 'N/A')}% | "
-        f"Cores: {cpu.get('cores_physical', 'N/A')}P/"
-        f"{cpu.get('cores_logical', 'N/A')}L | "
-        f"Freq: {cpu.get('frequency_mhz', 'N/A')} MHz"
-)
-
+    if "cpu" in data:
+        cpu = data["cpu"] or {}
+        rows.append((
+            "CPU",
+            f"Usage: {cpu.get('usage_percent', 'N/A')}% | "
+            f"Cores: {cpu.get('cores_physical', 'N/A')}P/"
+            f"{cpu.get('cores_logical', 'N/A')}L | "
+            f"Freq: {cpu.get('frequency_mhz', 'N/A')} MHz"
+        ))
 
     # ── Memory ──────────────────────────
-    mem = data["memory"]
-    table.add_row(
-        "Memory",
-        f'RAM {mem["ram"]["percent"]}% '
-        f'({mem["ram"]["used_gb"]}/{mem["ram"]["total_gb"]} GB) | '
-        f'Swap {mem["swap"]["percent"]}%'
-)
-
+    if "memory" in data:
+        mem = data["memory"]
+        if mem:
+            rows.append((
+                "Memory",
+                f'RAM {mem["ram"]["percent"]}% '
+                f'({mem["ram"]["used_gb"]}/{mem["ram"]["total_gb"]} GB) | '
+                f'Swap {mem["swap"]["percent"]}%'
+            ))
+        else:
+            rows.append(("Memory", "N/A"))
 
     # ── SSD ─────────────────────────────
-    ssd = data["ssd"]
-    ssd_details = [
-        f"Health: {ssd['health']}",
-        f"Wear: {ssd['wear_percent']}%"
-    ]
+    if "ssd" in data:
+        ssd = data["ssd"] or {"devices": {}}
+        devices = ssd.get("devices", {})
+        for name, dev in devices.items():
+            ssd_details = [
+                f"Health: {dev['health']}",
+                f"Wear: {dev['wear_percent']}%"
+            ]
 
-    # Optional extended SSD info (if present)
-    if "data_written_tb" in ssd and ssd["data_written_tb"] is not None:
-        ssd_details.append(f"TBW: {ssd['data_written_tb']} TB")
-    if "power_on_hours" in ssd and ssd["power_on_hours"] is not None:
-        ssd_details.append(f"POH: {ssd['power_on_hours']} h")
-    if "unsafe_shutdowns" in ssd and ssd["unsafe_shutdowns"] is not None:
-        ssd_details.append(f"Unsafe: {ssd['unsafe_shutdowns']}")
+            # Optional extended SSD info (if present)
+            if dev.get("data_written_tb") is not None:
+                ssd_details.append(f"TBW: {dev['data_written_tb']} TB")
+            if dev.get("power_on_hours") is not None:
+                ssd_details.append(f"POH: {dev['power_on_hours']} h")
+            if dev.get("unsafe_shutdowns") is not None:
+                ssd_details.append(f"Unsafe: {dev['unsafe_shutdowns']}")
 
-    table.add_row("SSD", " | ".join(ssd_details))
+            rows.append((
+                "SSD" if len(devices) == 1 else f"SSD {name.rsplit('/', 1)[-1]}",
+                " | ".join(ssd_details)
+            ))
+
+        if not devices:
+            rows.append(("SSD", "N/A"))
 
     # ── Battery ─────────────────────────
-    bat = data["battery"]
-    if bat and bat.get("present"):
-        table.add_row(
-            "Battery",
-            f"{bat['percent']}% | Wear {bat['wear_percent']}% | Cycles {bat.get('cycle_count', 'N/A')}"
-        )
-    else:
-        table.add_row("Battery", "Not detected")
+    if "battery" in data:
+        bat = data["battery"]
+        if bat and bat.get("present"):
+            rows.append((
+                "Battery",
+                f"{bat['percent']}% | Wear {bat['wear_percent']}% | Cycles {bat.get('cycle_count', 'N/A')}"
+            ))
+        else:
+            rows.append(("Battery", "Not detected"))
 
     # ── GPU ─────────────────────────────
-    gpu = data["gpu"]
-    if gpu["nvidia"]:
-        ng = gpu["nvidia"]
-        table.add_row(
-            "NVIDIA GPU",
-            f"{ng['temperature']}°C | VRAM {ng['vram_used_mb']}/{ng['vram_total_mb']} MB | {ng['power_state']}"
-        )
-    else:
-        table.add_row("GPU", "Intel iGPU (Optimus, power-saving)")
+    if "gpu" in data:
+        gpu = data["gpu"] or {}
+        nvidia = gpu.get("nvidia_gpus") or ([gpu["nvidia"]] if gpu.get("nvidia") else [])
+        if nvidia:
+            for ng in nvidia:
+                rows.append((
+                    "NVIDIA GPU" if len(nvidia) == 1 else f"NVIDIA GPU {ng.get('index', '')}",
+                    f"{ng['temperature']}°C | VRAM {ng['vram_used_mb']}/{ng['vram_total_mb']} MB | {ng['power_state']}"
+                ))
+        else:
+            rows.append(("GPU", "Intel iGPU (Optimus, power-saving)"))
 
     # ── Services ────────────────────────
-    table.add_row("Failed Services", str(data["services"]))
+    if "services" in data:
+        services = data["services"]
+        if isinstance(services, (list, tuple)):
+            rows.append((
+                "Failed Services",
+                f"{len(services)}" + (f" | {', '.join(services)}" if services else "")
+            ))
+        else:
+            rows.append(("Failed Services", str(services)))
+
+    # ── Top processes ───────────────────
+    if "processes" in data:
+        procs = data["processes"] or {}
+        cpu_top = ", ".join(f"{p['name']} {p['cpu_percent']}%" for p in procs.get("top_cpu", [])[:3])
+        mem_top = ", ".join(f"{p['name']} {p['rss_mb']} MB" for p in procs.get("top_memory", [])[:3])
+        rows.append((
+            "Top Processes",
+            f"CPU: {cpu_top or 'N/A'} | RAM: {mem_top or 'N/A'}"
+        ))
+
+    # ── Monitor (adaptive watch mode) ───
+    monitor = data.get("monitor")
+    if monitor:
+        cpu = monitor["cpu_percent"]
+        details = f"CPU {cpu}%" if cpu is not None else "CPU N/A"
+        if monitor["stretch"] > 1:
+            details += f" | Intervals ×{monitor['stretch']:g} ({', '.join(monitor['reasons'])})"
+        rows.append(("Monitor", details))
 
-    # ── Render ──────────────────────────
-    console.print(table)
-    console.print(
+    # ── Stale collectors ────────────────
+    if data.get("stale"):
+        rows.append((
+            "Stale",
+            Text("Timed out: " + ", ".join(data["stale"]), style="yellow")
+        ))
+
+    return rows
+
+
+def build_dashboard(rows, score, issues):
+    table = Table(title="🩺 Arch System Health Monitor", show_lines=True)
+
+    table.add_column("Component", style="bold")
+    table.add_column("Details")
+
+    for component, details in rows:
+        table.add_row(Text(component), Text(details) if isinstance(details, str) else details)
+
+    parts = [
+        table,
         Panel(
             f"{score}/100",
             title="Overall Health Score",
             style="green" if score >= 80 else "yellow"
         )
-    )
+    ]
 
     if issues:
-        console.print(
-            Panel("\n".join(issues), title="⚠ Issues Detected", style="red")
+        parts.append(
+            Panel(Text("\n".join(issues)), title="⚠ Issues Detected", style="red")
         )
     else:
-        console.print(
+        parts.append(
             Panel("System is healthy ✔", style="green")
         )
+
+    return Group(*parts)
+
+
+def render_dashboard(data, score, issues):
+    with instrument.stage("render_dashboard"):
+        console.print(build_dashboard(dashboard_rows(data), score, issues))
+
+
+class LiveDashboard:
+    """
+    In-place dashboard for watch mode.
+
+    The screen is redrawn through rich.live.Live (cursor moves, no
+    clear/scrollback) and only when a displayed value changed.
+    """
+
+    def __init__(self):
+        self.live = Live(console=console, auto_refresh=False)
+        self.shown = None
+
+    def __enter__(self):
+        self.live.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self.live.__exit__(*exc)
+
+    def update(self, data, score, issues):
+        rows = dashboard_rows(data)
+        key = (rows, score, issues)
+        if key == self.shown:
+            return
+
+        self.shown = key
+        self.live.update(build_dashboard(rows, score, issues), refresh=True)
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import sys
+import time
+
+from core.publish import read_snapshot
+from engine.history import extract_series
+from engine.rules import default_engine
+from engine.score_v2 import COMPONENT_MAX, clamp
+
+EXPORTER_HOST = "127.0.0.1"
+EXPORTER_PORT = 9877
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Largest request head we bother reading
+MAX_REQUEST = 8192
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Family:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.samples = []
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+
+    def render(self, out):
+        if not self.samples:
+            return
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} gauge")
+        for labels, value in self.samples:
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            out.append(f"{self.name}{{{label_str}}} {value}" if label_str else f"{self.name} {value}")
+
+
+def render_metrics(data, components, published=None):
+    """
+    Prometheus text exposition of one snapshot: overall score,
+    per-component scores and issue flags (`components`, from
+    RuleEngine.components()), and the raw readings.
+    """
+    f = {
+        "score": _Family("arch_health_score", "Overall health score (0-100)"),
+        "component": _Family("arch_health_component_score", "Score of one health component"),
+        "component_max": _Family("arch_health_component_max", "Maximum score of one health component"),
+        "issue": _Family("arch_health_issue", "Issue currently reported by the health engine"),
+        "cpu": _Family("arch_health_cpu_usage_percent", "CPU usage"),
+        "temp": _Family("arch_health_temperature_celsius", "Sensor temperature"),
+        "mem": _Family("arch_health_memory_used_percent", "RAM or swap usage"),
+        "gpu_temp": _Family("arch_health_gpu_temperature_celsius", "NVIDIA GPU temperature"),
+        "gpu_vram": _Family("arch_health_gpu_vram_used_megabytes", "NVIDIA GPU memory in use"),
+        "bat": _Family("arch_health_battery_percent", "Battery charge"),
+        "bat_wear": _Family("arch_health_battery_wear_percent", "Battery wear"),
+        "ssd_wear": _Family("arch_health_ssd_wear_percent", "SSD wear (percentage used)"),
+        "ssd_ok": _Family("arch_health_ssd_smart_passed", "1 if the SMART self-assessment passed"),
+        "failed": _Family("arch_health_failed_units", "Failed systemd units"),
+        "unit": _Family("arch_health_failed_unit", "Failed systemd unit"),
+        "stale": _Family("arch_health_collector_stale", "Collector missed its deadline this tick"),
+        "proc_cpu": _Family("arch_health_top_process_cpu_percent", "CPU use of the busiest processes"),
+        "proc_rss": _Family("arch_health_top_process_resident_megabytes", "Resident memory of the largest processes"),
+        "time": _Family("arch_health_snapshot_timestamp_seconds", "When the snapshot was collected"),
+    }
+
+    f["score"].add(clamp(sum(sub_score for sub_score, _ in components.values())))
+    for component, (sub_score, issues) in components.items():
+        f["component"].add(sub_score, component=component)
+        f["component_max"].add(COMPONENT_MAX[component], component=component)
+        for issue in issues:
+            # Keep the label stable: readings, baselines and process
+            # attribution in parentheses change every tick
+            f["issue"].add(1, component=component, issue=issue.split(" (", 1)[0])
+
+    for name, value in extract_series(data).items():
+        parts = name.split(".")
+        if name == "cpu.usage":
+            f["cpu"].add(value)
+        elif parts[0] == "temps":
+            f["temp"].add(value, sensor=parts[1])
+        elif parts[0] == "memory":
+            f["mem"].add(value, kind=parts[1])
+        elif parts[0] == "gpu" and len(parts) == 3:
+            f["gpu_temp" if parts[2] == "temperature" else "gpu_vram"].add(value, gpu=parts[1])
+        elif name == "battery.percent":
+            f["bat"].add(value)
+        elif name == "battery.wear":
+            f["bat_wear"].add(value)
+        elif name == "services.failed":
+            f["failed"].add(value)
+
+    for device, dev in ((data.get("ssd") or {}).get("devices") or {}).items():
+        if dev.get("health") == "UNSUPPORTED":
+            continue
+        f["ssd_ok"].add(1 if dev.get("health") == "PASSED" else 0, device=device)
+        if dev.get("wear_percent") is not None:
+            f["ssd_wear"].add(dev["wear_percent"], device=device)
+
+    services = data.get("services")
+    if isinstance(services, (list, tuple)):
+        for unit in services:
+            f["unit"].add(1, unit=unit)
+
+    # Labelled by rank, not pid, so the number of series stays bounded
+    processes = data.get("processes") or {}
+    for rank, p in enumerate(processes.get("top_cpu", ()), 1):
+        f["proc_cpu"].add(p["cpu_percent"], rank=rank, name=p["name"])
+    for rank, p in enumerate(processes.get("top_memory", ()), 1):
+        f["proc_rss"].add(p["rss_mb"], rank=rank, name=p["name"])
+
+    for collector in data.get("stale") or ():
+        f["stale"].add(1, collector=collector)
+
+    f["time"].add(published or time.time())
+
+    out = []
+    for family in f.values():
+        family.render(out)
+    return ("\n".join(out) + "\n").encode()
+
+
+class Exporter:
+    """
+    asyncio HTTP endpoint serving /metrics from a pre-rendered payload.
+
+    The payload is rebuilt once per tick in a worker thread (from the
+    daemon's shared-memory snapshot when one is running); requests only
+    copy bytes out, so any number of concurrent scrapes never trigger
+    a collection. Every snapshot is scored once, by the shared
+    long-running engine, which yields both the score and the
+    per-component breakdown; a daemon snapshot that has not changed
+    since the last tick keeps the previous payload.
+    """
+
+    def __init__(self, interval, host=EXPORTER_HOST, port=EXPORTER_PORT, unix_path=None):
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.payload = b""
+        # Publish time of the daemon snapshot behind the payload
+        self.published = None
+
+    def _render(self):
+        snapshot = read_snapshot()
+        if snapshot and snapshot["time"] == self.published:
+            # Unchanged; re-scoring would feed the anomaly detector the
+            # same sample again
+            return self.payload
+        if snapshot:
+            data, published = snapshot["data"], snapshot["time"]
+        else:
+            from core.collect import collect
+            data, published = collect(), None
+        payload = render_metrics(data, default_engine().components(data), published)
+        self.published = published
+        return payload
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            # Stay on the tick grid; a slow render skips missed ticks
+            next_tick = max(next_tick + self.interval, loop.time())
+            await asyncio.sleep(next_tick - loop.time())
+            try:
+                self.payload = await loop.run_in_executor(None, self._render)
+            except Exception as e:
+                # Keep serving the last payload; its timestamp shows its age
+                print(f"arch-health: rendering metrics failed: {e!r}", file=sys.stderr)
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            writer.close()
+            return
+
+        method, path = (head.split(b" ", 2) + [b"", b""])[:2]
+        path = path.split(b"?", 1)[0]
+
+        if method == b"GET" and path in (b"/metrics", b"/"):
+            status, body, ctype = "200 OK", self.payload, CONTENT_TYPE
+        else:
+            status, body, ctype = "404 Not Found", b"not found\n", "text/plain"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {ctype}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        # Never answer a scrape with an empty payload
+        self.payload = await loop.run_in_executor(None, self._render)
+        refresher = asyncio.create_task(self._refresh_loop())
+
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            server = await asyncio.start_unix_server(self._handle, self.unix_path, limit=MAX_REQUEST)
+        else:
+            server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+def run_exporter(interval, host=EXPORTER_HOST, port=EXPORTER_PORT, unix_path=None):
+    asyncio.run(Exporter(interval, host, port, unix_path).serve())
@@ -1,26 +1,154 @@
+import math
 import sys
+import time
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout,
     QProgressBar, QFrame
 )
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QObject, QPointF, QRect, QRunnable, QThreadPool, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen
 
-from core.cpu import get_cpu
-from core.memory import get_memory
-from core.ssd import get_ssd_health
-from core.battery import get_battery_health
-from core.gpu import get_gpu_health
-from core.system import failed_services
-from core.temps import get_temperatures
-from engine.score_v2 import calculate_health
+from core.publish import LiveSnapshot
+from core.scheduler import AdaptiveScheduler
+from engine.rules import field_reader
+from engine.score_v2 import worst_ssd_device
+
+_ram_percent = field_reader("memory.ram.percent")
+_gpu_hottest = field_reader("gpu.hottest")
+
+
+# =========================
+# Background Collection
+# =========================
+class CollectorSignals(QObject):
+    # (data, score, issues, refreshed collectors), delivered on the UI thread
+    finished = pyqtSignal(object, int, list, list)
+    # Error message when a refresh raised
+    failed = pyqtSignal(str)
+
+
+class CollectTask(QRunnable):
+    """
+    One refresh of the due collectors, scored on a QThreadPool worker,
+    so the Qt event loop never waits on sysfs, smartctl or nvidia-smi.
+    With a daemon running this is just a shared-memory read.
+    """
+
+    def __init__(self, signals: CollectorSignals, live: LiveSnapshot, due):
+        super().__init__()
+        self.signals = signals
+        self.live = live
+        self.due = due
+
+    def run(self):
+        # Always answer, or the window would wait for this refresh forever
+        try:
+            data, score, issues = self.live.refresh(self.due)
+        except Exception as e:
+            self.signals.failed.emit(repr(e))
+            return
+        self.signals.finished.emit(data, score, issues, list(self.due))
+
+
+# =========================
+# Sparkline
+# =========================
+class Sparkline(QWidget):
+    """
+    Recent values of one or more series, newest on the right.
+
+    Every series keeps a fixed-size ring of samples and a matching list
+    of QPointF objects, both allocated once. push() scrolls the pixels
+    already on screen left by STEP with QWidget.scroll() and marks only
+    the newly exposed strip dirty, so a tick repaints a few pixels
+    instead of the whole chart; Qt folds that into the window's next
+    paint. Ranges are fixed per series so old pixels never need
+    redrawing after a rescale.
+    """
+
+    STEP = 3
+    CAPACITY = 512
+
+    def __init__(self, series, height=28):
+        """
+        `series` is a list of (color, low, high).
+        """
+        super().__init__()
+        self.setFixedHeight(height)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        self.pens = []
+        self.ranges = []
+        for color, low, high in series:
+            pen = QPen(QColor(color))
+            pen.setWidthF(1.5)
+            self.pens.append(pen)
+            self.ranges.append((low, high))
+
+        self.background = QColor("#1e1e2e")
+        self.values = [[math.nan] * self.CAPACITY for _ in series]
+        self.points = [[QPointF() for _ in range(self.CAPACITY)] for _ in series]
+        # Index of the newest sample and number of samples pushed
+        self.head = -1
+        self.count = 0
+
+    def push(self, *values):
+        """
+        Append one sample per series (None leaves a gap).
+        """
+        self.head = (self.head + 1) % self.CAPACITY
+        self.count += 1
+        for ring, value in zip(self.values, values):
+            ring[self.head] = math.nan if value is None else float(value)
+
+        if not self.isVisible():
+            return
+        w = self.width()
+        self.scroll(-self.STEP, 0)
+        # The new segment plus a pen width of overlap with the old one
+        self.update(QRect(w - self.STEP - 2, 0, self.STEP + 2, self.height()))
+
+    def paintEvent(self, event):
+        rect = event.rect()
+        painter = QPainter(self)
+        painter.fillRect(rect, self.background)
+        if not self.count:
+            return
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setClipRect(rect)
+
+        w, h = self.width(), self.height()
+        right = w - 1
+        # Samples whose segments touch the dirty rect; age 0 is newest
+        first = max((right - rect.right()) // self.STEP - 1, 0)
+        last = min((right - rect.left()) // self.STEP + 1, self.count - 1, self.CAPACITY - 1)
+
+        for ring, points, pen, (low, high) in zip(self.values, self.points, self.pens, self.ranges):
+            painter.setPen(pen)
+            scale = (h - 3) / (high - low)
+            run = 0
+            # Oldest to newest, split at gaps
+            for age in range(last, first - 1, -1):
+                value = ring[(self.head - age) % self.CAPACITY]
+                if value != value:
+                    if run > 1:
+                        painter.drawPolyline(points[:run])
+                    run = 0
+                    continue
+                y = h - 2 - (min(max(value, low), high) - low) * scale
+                point = points[run]
+                point.setX(right - age * self.STEP)
+                point.setY(y)
+                run += 1
+            if run > 1:
+                painter.drawPolyline(points[:run])
 
 
 # =========================
 # Metric Card (Reusable)
 # =========================
 class MetricCard(QFrame):
-    def __init__(self, title: str):
+    def __init__(self, title: str, series=None):
         super().__init__()
 
         self.setStyleSheet("""
@@ -56,6 +184,8 @@ class MetricCard(QFrame):
             }
         """)
 
+        self.color = None
+
         self.subtext = QLabel("")
         self.subtext.setStyleSheet("color: #a6adc8; font-size: 11px;")
 
@@ -64,20 +194,29 @@ class MetricCard(QFrame):
         layout.addWidget(self.bar)
         layout.addWidget(self.subtext)
 
+        self.sparkline = None
+        if series:
+            self.sparkline = Sparkline(series)
+            layout.addWidget(self.sparkline)
+
     def update(self, percent: int, subtext: str = "", color: str = "#89b4fa"):
         self.value.setText(f"{percent} %")
         self.bar.setValue(percent)
 
-        self.bar.setStyleSheet(f"""
-            QProgressBar {{
-                background-color: #313244;
-                border-radius: 5px;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 5px;
-            }}
-        """)
+        # Re-polishing a stylesheet is expensive; only do it when the
+        # color band actually changes
+        if color != self.color:
+            self.color = color
+            self.bar.setStyleSheet(f"""
+                QProgressBar {{
+                    background-color: #313244;
+                    border-radius: 5px;
+                }}
+                QProgressBar::chunk {{
+                    background-color: {color};
+                    border-radius: 5px;
+                }}
+            """)
 
         self.subtext.setText(subtext)
 
@@ -90,7 +229,7 @@ class HealthWindow(QWidget):
         super().__init__()
 
         self.setWindowTitle("Arch Health Monitor")
-        self.setMinimumSize(420, 600)
+        self.setMinimumSize(420, 720)
         self.setStyleSheet("background-color: #11111b; color: #cdd6f4;")
 
         main = QVBoxLayout(self)
@@ -107,13 +246,16 @@ class HealthWindow(QWidget):
         self.score_label.setFont(QFont("Inter", 28, QFont.Weight.Bold))
         self.score_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main.addWidget(self.score_label)
-
-        # Metric Cards
-        self.cpu_card = MetricCard("CPU Usage")
-        self.mem_card = MetricCard("Memory Usage")
-        self.ssd_card = MetricCard("SSD Wear")
+        self.score_color = None
+        self.score_trend = Sparkline([("#cba6f7", 0, 100)])
+        main.addWidget(self.score_trend)
+
+        # Metric Cards, with trends of usage (blue) and temperature (peach)
+        self.cpu_card = MetricCard("CPU Usage", [("#89b4fa", 0, 100), ("#fab387", 20, 105)])
+        self.mem_card = MetricCard("Memory Usage", [("#89b4fa", 0, 100)])
+        self.ssd_card = MetricCard("SSD Wear", [("#fab387", 20, 90)])
         self.bat_card = MetricCard("Battery")
-        self.gpu_card = MetricCard("GPU")
+        self.gpu_card = MetricCard("GPU", [("#fab387", 20, 105)])
 
         # GPU is text-only
         self.gpu_card.bar.hide()
@@ -124,63 +266,110 @@ class HealthWindow(QWidget):
         main.addWidget(self.bat_card)
         main.addWidget(self.gpu_card)
 
-        # Auto refresh every 3 seconds
+        # Monitor's own CPU usage and current backoff
+        self.monitor_label = QLabel("")
+        self.monitor_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.monitor_label.setStyleSheet("color: #6c7086; font-size: 11px;")
+        main.addWidget(self.monitor_label)
+
+        # Collection runs on a worker; results come back as a signal
+        self.pool = QThreadPool.globalInstance()
+        self.signals = CollectorSignals()
+        self.signals.finished.connect(self.apply_snapshot)
+        self.signals.failed.connect(self.collect_failed)
+        self.collecting = False
+
+        # Each collector refreshes at its own cadence; a single-shot
+        # timer is armed for the next wake-up after every refresh
+        self.scheduler = AdaptiveScheduler()
+        self.live = LiveSnapshot()
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.refresh)
-        self.timer.start(3000)
 
         self.refresh()
 
+    def schedule(self):
+        delay = max(self.scheduler.next_wakeup() - time.monotonic(), 0)
+        self.timer.start(int(delay * 1000))
+
     def refresh(self):
-        data = {
-            "cpu": get_cpu(),
-            "memory": get_memory(),
-            "temps": get_temperatures(),
-            "ssd": get_ssd_health(),
-            "battery": get_battery_health(),
-            "gpu": get_gpu_health(),
-            "services": failed_services(),
-        }
-
-        score, _ = calculate_health(data)
+        # A refresh in flight re-arms the timer when it lands, so slow
+        # collectors never queue work behind them
+        if self.collecting:
+            return
+
+        due = self.scheduler.due()
+        if not due:
+            self.schedule()
+            return
+
+        self.collecting = True
+        self.pool.start(CollectTask(self.signals, self.live, due))
+
+    def collect_failed(self, message):
+        # Keep the last readings on screen and try again at the next wake-up
+        self.collecting = False
+        self.schedule()
+        self.monitor_label.setText(f"Refresh failed: {message}")
+
+    def apply_snapshot(self, data, score, issues, due):
+        self.collecting = False
+
+        self.scheduler.observe(data)
+        self.schedule()
+
+        status = self.scheduler.status()
+        text = f"Monitor CPU {status['cpu_percent'] if status['cpu_percent'] is not None else '--'}%"
+        if status["stretch"] > 1:
+            text += f" · refresh ×{status['stretch']:g} ({', '.join(status['reasons'])})"
+        self.monitor_label.setText(text)
+
         self.score_label.setText(f"{score} / 100")
 
-        if score >= 80:
-            self.score_label.setStyleSheet("color: #a6e3a1;")
-        elif score >= 60:
-            self.score_label.setStyleSheet("color: #f9e2af;")
-        else:
-            self.score_label.setStyleSheet("color: #f38ba8;")
+        color = "#a6e3a1" if score >= 80 else "#f9e2af" if score >= 60 else "#f38ba8"
+        if color != self.score_color:
+            self.score_color = color
+            self.score_label.setStyleSheet(f"color: {color};")
+
+        self.push_trends(data, score, due)
+
+        # Collectors that missed their deadline on the very first tick
+        # come back as None; their cards keep showing "--" until then.
 
         # CPU
         cpu = data["cpu"]
-        cpu_usage = int(cpu["usage_percent"])
-        cpu_temp = data["temps"]["cpu"]["current"]
-        self.cpu_card.update(
-            cpu_usage,
-            f"Temp: {cpu_temp}°C | Freq: {cpu['frequency_mhz']} MHz",
-            "#a6e3a1" if cpu_usage < 70 else "#f9e2af" if cpu_usage < 90 else "#f38ba8"
-        )
+        if cpu:
+            cpu_usage = int(cpu["usage_percent"])
+            cpu_temp = (data["temps"] or {}).get("cpu", {}).get("current", "N/A")
+            self.cpu_card.update(
+                cpu_usage,
+                f"Temp: {cpu_temp}°C | Freq: {cpu['frequency_mhz']} MHz",
+                "#a6e3a1" if cpu_usage < 70 else "#f9e2af" if cpu_usage < 90 else "#f38ba8"
+            )
 
         # Memory
-        ram = data["memory"]["ram"]
-        self.mem_card.update(
-            int(ram["percent"]),
-            f"{ram['used_gb']} / {ram['total_gb']} GB"
-        )
-
-        # SSD
-        wear = data["ssd"]["wear_percent"] or 0
-        self.ssd_card.update(
-            wear,
-            f"Health: {data['ssd']['health']}",
-            "#a6e3a1" if wear < 30 else "#f9e2af" if wear < 60 else "#f38ba8"
-        )
+        if data["memory"]:
+            ram = data["memory"]["ram"]
+            self.mem_card.update(
+                int(ram["percent"]),
+                f"{ram['used_gb']} / {ram['total_gb']} GB"
+            )
+
+        # SSD (worst device)
+        ssd_name, ssd = worst_ssd_device(data["ssd"])
+        if ssd:
+            wear = ssd["wear_percent"] or 0
+            self.ssd_card.update(
+                wear,
+                f"{ssd_name} | Health: {ssd['health']}",
+                "#a6e3a1" if wear < 30 else "#f9e2af" if wear < 60 else "#f38ba8"
+            )
 
         # Battery
         battery = data["battery"]
 
-        if battery:
+        if battery and battery.get("present"):
             bat = int(battery["percent"])
 
             charging = battery.get("charging")
@@ -196,15 +385,36 @@ class HealthWindow(QWidget):
                 status,
                 "#a6e3a1" if bat > 50 else "#f9e2af" if bat > 20 else "#f38ba8"
             )
-        else:
+        elif battery is not None:
             self.bat_card.update(0, "No Battery")
-        
 
         # GPU
-        self.gpu_card.value.setText(
-            "NVIDIA Active" if data["gpu"]["nvidia"] else "Intel / Optimus"
-        )
-        self.gpu_card.subtext.setText("")
+        if data["gpu"]:
+            self.gpu_card.value.setText(
+                "NVIDIA Active" if data["gpu"]["nvidia"] else "Intel / Optimus"
+            )
+            self.gpu_card.subtext.setText("")
+
+
+    def push_trends(self, data, score, due):
+        """
+        Advance each sparkline when the collector behind it refreshed,
+        so every chart moves at its own collector's cadence.
+        """
+        temps = data.get("temps") or {}
+        self.score_trend.push(score)
+
+        if "cpu" in due:
+            cpu = data.get("cpu") or {}
+            self.cpu_card.sparkline.push(
+                cpu.get("usage_percent"), (temps.get("cpu") or {}).get("current")
+            )
+        if "memory" in due:
+            self.mem_card.sparkline.push(_ram_percent(data))
+        if "temps" in due:
+            self.ssd_card.sparkline.push((temps.get("nvme") or {}).get("current"))
+        if "gpu" in due:
+            self.gpu_card.sparkline.push(_gpu_hottest(data))
 
 
 # =========================